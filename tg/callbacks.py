@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+#
+#  MoneyTracker - Callback data codec & router.
+#  Created by LulzLoL231 at 18/10/26
+#
+import inspect
+import logging
+from typing import Any, Awaitable, Callable, Iterable, NamedTuple
+
+from aiogram import types
+from aiogram.dispatcher.storage import FSMContext
+from aiogram.dispatcher.filters.state import State, StatesGroup
+
+
+SEP = '#'
+# Telegram limit for callback_data.
+MAX_LENGTH = 64
+log = logging.getLogger('MoneyTracker')
+
+
+def pack(action: str, *args: int | str | None) -> str:
+    '''Encodes callback data, like "order#12".
+
+    Args:
+        action (str): Handler action.
+        *args (int | str | None): Handler args, None is "not set".
+
+    Raises:
+        ValueError: Arg contains separator or data is too long.
+
+    Returns:
+        str: callback_data.
+    '''
+    values = ['' if i is None else str(i) for i in args]
+    while values and not values[-1]:
+        values.pop()
+    if any(SEP in i for i in values):
+        raise ValueError(f'Callback arg contains "{SEP}": {values}')
+    data = SEP.join([action, *values])
+    if len(data.encode()) > MAX_LENGTH:
+        raise ValueError(f'Callback data is too long: {data}')
+    return data
+
+
+def unpack(data: str) -> tuple[str, list[str]]:
+    '''Decodes callback data.
+
+    Args:
+        data (str): callback_data.
+
+    Returns:
+        tuple[str, list[str]]: Action and raw args.
+    '''
+    action, *args = data.split(SEP)
+    return action, args
+
+
+class Route(NamedTuple):
+    handler: Callable[..., Awaitable[Any]]
+    # None for any state.
+    states: frozenset[str | None] | None
+    args: dict[str, type]
+    with_state: bool
+
+    def parse(self, args: list[str]) -> dict[str, Any]:
+        '''Converts raw args to handler kwargs.
+
+        Raises:
+            ValueError: Too many args or wrong arg type.
+        '''
+        if len(args) > len(self.args):
+            raise ValueError(f'Too many callback args: {args}')
+        args = args + [''] * (len(self.args) - len(args))
+        return {
+            name: arg_type(value) if value else None
+            for (name, arg_type), value in zip(self.args.items(), args)
+        }
+
+
+def _get_states(state: Any) -> frozenset[str | None] | None:
+    '''Normalizes handler state filter, like aiogram does.
+    '''
+    if state == '*':
+        return None
+    if state is None or isinstance(state, (str, State)):
+        state = [state]
+    elif inspect.isclass(state) and issubclass(state, StatesGroup):
+        state = state.all_states
+    elif not isinstance(state, Iterable):
+        raise TypeError(f'Unknown state filter: {state}')
+    return frozenset(i.state if isinstance(i, State) else i for i in state)
+
+
+class CallbackRouter:
+    '''Dispatches callback queries by action with one dict lookup.
+
+    State filter has aiogram semantics: without state handler runs only
+    when no state is set, "*" is any state.
+    '''
+    def __init__(self) -> None:
+        self.routes: dict[str, list[Route]] = {}
+
+    def __call__(
+        self, action: str, state: Any = None, **args: type
+    ) -> Callable:
+        '''Registers handler for action.
+
+        Handler is called with query, parsed args as kwargs
+        and "state" if it accepts one.
+
+        Args:
+            action (str): Action, first part of callback data.
+            state (optional): aiogram state filter. Defaults is None.
+            **args (type): Handler args names & types, in data order.
+        '''
+        if SEP in action:
+            raise ValueError(f'Action contains "{SEP}": {action}')
+
+        def decorator(handler: Callable) -> Callable:
+            route = Route(
+                handler, _get_states(state), args,
+                'state' in inspect.signature(handler).parameters
+            )
+            routes = self.routes.setdefault(action, [])
+            for i in routes:
+                if i.states is None or route.states is None \
+                        or i.states & route.states:
+                    raise ValueError(
+                        f'Action "{action}" handlers states intersect.'
+                    )
+            routes.append(route)
+            return handler
+        return decorator
+
+    async def dispatch(
+        self, query: types.CallbackQuery, state: FSMContext
+    ) -> Any:
+        '''Single callback query handler, runs action handler.
+
+        Args:
+            query (types.CallbackQuery): Tg callback query.
+            state (FSMContext): Chat state.
+        '''
+        action, args = unpack(query.data or '')
+        routes = self.routes.get(action)
+        if routes:
+            current = await state.get_state()
+            for route in routes:
+                if route.states is not None and current not in route.states:
+                    continue
+                try:
+                    kwargs = route.parse(args)
+                except ValueError as e:
+                    log.warning(f'Bad callback data {query.data}: {e}')
+                    break
+                if route.with_state:
+                    kwargs['state'] = state
+                return await route.handler(query, **kwargs)
+        log.debug(f'Unhandled callback data: {query.data}')
+        await query.answer()
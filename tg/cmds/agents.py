@@ -8,16 +8,17 @@ from aiogram.dispatcher.storage import FSMContext
 from aiogram.dispatcher.filters.state import State, StatesGroup
 
 from config import check_admin
-from runtimes import log, bot
+from runtimes import log, bot, callbacks
 from database.main import db as Database
 from keyboards import Keyboards as keys
+from utils import gather
 
 
 class AddAgent(StatesGroup):
     NAME = State()
 
 
-@bot.callback_query_handler(lambda q: q.data == 'agents', state='*')
+@callbacks('agents', state='*')
 @check_admin()
 async def agents(query: types.CallbackQuery, state: FSMContext):
     log.info(
@@ -25,28 +26,36 @@ async def agents(query: types.CallbackQuery, state: FSMContext):
     )
     if state:
         await state.finish()
-    agents = await Database.get_agents()
+    _, agents, stats = await gather(
+        query.answer(), Database.get_agents(),
+        Database.get_orders_stats_by_agent()
+    )
     if agents:
         cnt = 'Список агентов:\n\n'
-        cnt += '\n'.join([f'#{a.uid} - {a.name}' for a in agents])
+        for a in agents:
+            cnt += f'#{a.uid} - {a.name}'
+            if a.uid in stats and stats[a.uid].inprogress_count:
+                cnt += (
+                    f' (в работе: {stats[a.uid].inprogress_count}, '
+                    f'{stats[a.uid].inprogress_sum} руб.)'
+                )
+            cnt += '\n'
     else:
         cnt = 'Агенты отсутствуют. Добавьте нового!'
-    await query.answer()
     await query.message.edit_text(cnt, reply_markup=keys.inline_agents())
 
 
-@bot.callback_query_handler(lambda q: q.data == 'add_agent')
+@callbacks('add_agent')
 @check_admin()
 async def add_agent(query: types.CallbackQuery):
     log.info(
         f'Called by {query.message.chat.mention} ({query.message.chat.id})'
     )
     await AddAgent.NAME.set()
-    await query.answer()
-    await query.message.edit_text(
+    await gather(query.answer(), query.message.edit_text(
         'Добавление нового агента.\n\nОтправьте имя агента.',
         reply_markup=keys.back('agents', 'Отмена')
-    )
+    ))
 
 
 @bot.message_handler(
@@ -57,21 +66,23 @@ async def add_agent_finish(msg: types.Message, state: FSMContext):
     log.info(f'Called by {msg.chat.mention} ({msg.chat.id})')
     await state.finish()
     agent = await Database.add_agent(msg.text)
-    Database.get_agent_by_uid.cache_clear()
     await msg.answer(
         f'Агент #{agent.uid} - Добавлен!',
         reply_markup=keys.back('agents', 'К агентам')
     )
 
 
-@bot.callback_query_handler(lambda q: q.data == 'del_agents')
+@callbacks('del_agents', after=int, before=int)
 @check_admin()
-async def del_agent_start(query: types.CallbackQuery):
+async def del_agent_start(
+    query: types.CallbackQuery, after: int | None = None,
+    before: int | None = None
+):
     log.info(
         f'Called by {query.message.chat.mention} ({query.message.chat.id})'
     )
-    agents = await Database.get_agents()
-    if not agents:
+    agents = await Database.get_agents_page(after or 0, before)
+    if not agents.items:
         await query.answer('Агенты отсутствуют. Нечего удалять.')
     else:
         await query.answer()
@@ -81,14 +92,12 @@ async def del_agent_start(query: types.CallbackQuery):
         )
 
 
-@bot.callback_query_handler(lambda q: q.data.startswith('del_agent'))
+@callbacks('del_agent', agent_uid=int)
 @check_admin()
-async def del_agent_end(query: types.CallbackQuery):
+async def del_agent_end(query: types.CallbackQuery, agent_uid: int):
     log.info(
         f'Called by {query.message.chat.mention} ({query.message.chat.id})'
     )
-    agent_uid = int(query.data.split('#')[1])
     await Database.del_agent(agent_uid)
-    Database.get_agent_by_uid.cache_clear()
     await query.answer(f'Агент #{agent_uid} - удален!')
     await agents(query, None)
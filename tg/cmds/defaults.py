@@ -7,9 +7,10 @@ from aiogram import types
 from aiogram.dispatcher.storage import FSMContext
 
 from config import cfg, check_admin
-from runtimes import log, bot
+from runtimes import log, bot, callbacks
 from database.main import db as Database
 from keyboards import Keyboards as keys
+from utils import gather
 
 
 @bot.message_handler(commands=['start'], state='*')
@@ -17,18 +18,13 @@ from keyboards import Keyboards as keys
 @check_admin()
 async def start_bot(msg: types.Message, state: FSMContext, query=False):
     log.info(f'Called by {msg.chat.mention} ({msg.chat.id})')
-    await state.finish()
-    await types.ChatActions.typing()
-    orders = await Database.get_inprogress_orders()
+    _, _, dashboard = await gather(
+        state.finish(), types.ChatActions.typing(), Database.get_dashboard()
+    )
     cnt = f'Привет {msg.chat.first_name}!\n\n'
-    if orders:
-        cnt += 'Текущие заказы:\n'
-        full_price = 0
-        for ord in orders:
-            cnt += f'{ord.get_short_str()}\n'
-            if ord.price:
-                full_price += ord.price
-        cnt += f'\nИтого: {full_price} руб.'
+    if dashboard:
+        cnt += f'Текущие заказы:\n{dashboard.text}\n'
+        cnt += f'\nИтого: {dashboard.total} руб.'
     else:
         cnt += 'Все заказы выполнены.'
     if query:
@@ -37,27 +33,28 @@ async def start_bot(msg: types.Message, state: FSMContext, query=False):
         await msg.answer(cnt, reply_markup=keys.start())
 
 
-@bot.callback_query_handler(lambda q: q.data == 'start', state='*')
+@callbacks('start', state='*')
 @check_admin()
 async def query_start(query: types.CallbackQuery, state: FSMContext):
     log.info(
         f'Called by {query.message.chat.mention} ({query.message.chat.id})'
     )
-    await query.answer()
-    await start_bot(query.message, state, True)
+    await gather(query.answer(), start_bot(query.message, state, True))
 
 
-@bot.callback_query_handler(lambda q: q.data == 'cancel', state='*')
+@callbacks('cancel', state='*')
 @check_admin()
 async def query_cancel(query: types.CallbackQuery, state: FSMContext):
     log.info(
         f'Called by {query.message.chat.mention} ({query.message.chat.id})'
     )
-    await query.answer('Действие отменено!', True)
-    await start_bot(query.message, state, True)
+    await gather(
+        query.answer('Действие отменено!', True),
+        start_bot(query.message, state, True)
+    )
 
 
-@bot.callback_query_handler(lambda q: q.data == 'about')
+@callbacks('about')
 @check_admin()
 async def query_about(query: types.CallbackQuery):
     log.info(
@@ -3,20 +3,25 @@
 #  MoneyTracker cmds: Orders.
 #  Created by LulzLoL231 at 12/11/22
 #
-from io import BytesIO
 from dataclasses import dataclass
 
-from openpyxl import Workbook
-from openpyxl.styles import Font
 from aiogram import types
 from aiogram.dispatcher.storage import FSMContext
 from aiogram.dispatcher.filters.state import State, StatesGroup
 
 from config import check_admin
-from runtimes import log, bot
-from database.schemas import Order
+from runtimes import log, bot, callbacks
+from database.schemas import ExportFilter
 from database.main import db as Database
+from database.directory import AgentDirectory
 from keyboards import Keyboards as keys
+from callbacks import pack
+from utils import gather
+from export import (
+    EXPORT_COMMAND_HELP, EXPORT_PRESETS, get_export_file_name,
+    get_export_preset, get_uploaded_export, make_export_file,
+    parse_export_command, set_uploaded_export
+)
 
 
 @dataclass
@@ -42,6 +47,10 @@ class OrderPrice(StatesGroup):
     PRICE = State()
 
 
+class SelectOrders(StatesGroup):
+    UIDS = State()
+
+
 def is_digit(data: str) -> bool:
     '''Is digit in data?
 
@@ -59,53 +68,74 @@ def is_digit(data: str) -> bool:
         return True
 
 
-async def make_export_file(orders: list[Order]) -> BytesIO:
-    '''Makes XLSX file and return it.
+def parse_order_shortcuts(
+    text: str, agents: AgentDirectory
+) -> tuple[list[dict], list[str]]:
+    '''Parses "create_order;name;price;agent" lines.
 
     Args:
-        orders (list[Order]): Array of Orders.
+        text (str): Message text, one order per line.
+        agents (AgentDirectory): Agents directory.
 
     Returns:
-        BytesIO: XLSX file.
+        tuple[list[dict], list[str]]: Orders and errors.
     '''
-    period = (
-        orders[0].start_date,
-        orders[::-1][0].start_date
-    )
-    wb = Workbook()
-    ws = wb.active
-    ws.title = f'с {str(period[0])} по {str(period[1])}'
-    ws['A1'] = '№ Заказа'
-    ws['A1'].font = Font(bold=True)
-    ws['B1'] = 'Цель'
-    ws['B1'].font = Font(bold=True)
-    ws['C1'] = 'Цена'
-    ws['C1'].font = Font(bold=True)
-    ws['D1'] = 'Агент'
-    ws['D1'].font = Font(bold=True)
-    ws['E1'] = 'Дата начала'
-    ws['E1'].font = Font(bold=True)
-    ws['F1'] = 'Дата оплаты'
-    ws['F1'].font = Font(bold=True)
-    rid = 2
-    for order in orders:
-        ws[f'A{rid}'] = order.uid
-        ws[f'B{rid}'] = order.name
-        if order.price:
-            ws[f'C{rid}'] = order.price
-        else:
-            ws[f'C{rid}'] = 'Н/д'
-        ws[f'D{rid}'] = order.agent.name
-        ws[f'E{rid}'] = str(order.start_date)
-        if order.end_date:
-            ws[f'F{rid}'] = str(order.end_date)
-        else:
-            ws[f'F{rid}'] = 'Не оплачен'
-        rid += 1
-    buf = BytesIO()
-    wb.save(buf)
-    buf.seek(0)
-    return buf
+    orders = []
+    errors = []
+    for num, line in enumerate(text.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            order = OrderShortcut(*line.split(';'))
+        except TypeError:
+            errors.append(f'Строка {num}: Неверный синтаксис!')
+            continue
+        if order.command.lower() != 'create_order':
+            errors.append(f'Строка {num}: Неверный синтаксис!')
+            continue
+        agent = agents.find(order.agent)
+        if not agent:
+            error = f'Строка {num}: Агент {order.agent} не найден!'
+            similar = agents.match(order.agent)
+            if similar:
+                error += ' Возможно: ' + ', '.join(a.name for a in similar)
+            errors.append(error)
+        if not is_digit(order.price):
+            errors.append(f'Строка {num}: Цена заказа не число!')
+        if agent and is_digit(order.price):
+            orders.append({
+                'name': order.name, 'price': int(order.price),
+                'agent_uid': agent.uid, 'agent_name': agent.name
+            })
+    return orders, errors
+
+
+def get_orders_verify_str(orders: list[dict], limit: int = 30) -> str:
+    '''Returns text for orders creation confirmation.
+
+    Args:
+        orders (list[dict]): Orders from `parse_order_shortcuts`.
+        limit (int, optional): Max listed orders. Defaults to 30.
+
+    Returns:
+        str: Message text.
+    '''
+    if len(orders) == 1:
+        cnt = 'Подтвердите заказ:\n\n'
+        cnt += f'Цель: {orders[0]["name"]}\n'
+        cnt += f'Цена: {orders[0]["price"]}\n'
+        cnt += f'Агент: {orders[0]["agent_name"]}\n\n'
+        cnt += 'Создать заказ?'
+        return cnt
+    cnt = f'Подтвердите заказы ({len(orders)}):\n\n'
+    for order in orders[:limit]:
+        cnt += f'{order["name"]} - {order["price"]} руб. ' \
+               f'({order["agent_name"]})\n'
+    if len(orders) > limit:
+        cnt += f'...и ещё {len(orders) - limit}\n'
+    cnt += f'\nИтого: {sum(o["price"] for o in orders)} руб.\n\n'
+    cnt += 'Создать заказы?'
+    return cnt
 
 
 @bot.message_handler(
@@ -117,87 +147,64 @@ async def create_order_shortcut(msg: types.Message, state: FSMContext):
     log.info(f'Called by {msg.chat.mention} ({msg.chat.id})')
     if state:
         await state.finish()
-    try:
-        order = OrderShortcut(*msg.text.split(';'))
-    except TypeError:
-        log.warning(
-            f'User #{msg.chat.id} use incorrect syntax for '
-            'order creation shortcut!'
-        )
-        await msg.answer('<b>ОШИБКА:</b> Неверный синтаксис!')
-        return
-    agents = await Database.get_agents()
-    agent_l = list(filter(
-        lambda a: a.name.lower() == order.agent.lower(), agents
-    ))
-    if not agent_l:
+    agents = await Database.get_agent_directory()
+    orders, errors = parse_order_shortcuts(msg.text, agents)
+    if errors:
         log.warning(
-            f'User #{msg.chat.id} selected unexistsing '
-            f'Agent name: {order.agent}'
+            f'User #{msg.chat.id} use incorrect order creation shortcut: '
+            f'{errors}'
         )
-        await msg.answer('<b>ОШИБКА:</b> Выбранный Агент не найден!')
+        await msg.answer('<b>ОШИБКА:</b>\n' + '\n'.join(errors))
         return
-    else:
-        agent = agent_l[0]
-    if not is_digit(order.price):
-        log.warning(
-            f'User #{msg.chat.id} use not digit in order price!'
-        )
-        await msg.answer('<b>ОШИБКА:</b> Цена заказа не число!')
+    if not orders:
+        await msg.answer('<b>ОШИБКА:</b> Неверный синтаксис!')
         return
     await AddOrder.VERIFY.set()
-    cnt = 'Подтвердите заказ:\n\n'
-    cnt += f'Цель: {order.name}\n'
-    cnt += f'Цена: {order.price}\n'
-    cnt += f'Агент: {agent.name}\n\n'
-    cnt += 'Создать заказ?'
-    await msg.answer(cnt, reply_markup=keys.inline_verify_order())
+    await state.update_data(orders=orders)
+    await msg.answer(
+        get_orders_verify_str(orders),
+        reply_markup=keys.inline_verify_order()
+    )
 
 
-@bot.callback_query_handler(lambda q: q.data == 'orders', state='*')
+@callbacks('orders', state='*', after=int, before=int)
 @check_admin()
 async def query_orders(
-    query: types.CallbackQuery, state: FSMContext, only_edit=False
+    query: types.CallbackQuery, state: FSMContext,
+    after: int | None = None, before: int | None = None, only_edit=False
 ):
     log.info(
         f'Called by {query.message.chat.mention} ({query.message.chat.id})'
     )
     if state:
         await state.finish()
-    orders = await Database.get_orders()
-    inprog_orders = list(filter(
-        (lambda o: not o.end_date),
-        orders
-    ))
-    if not inprog_orders:
-        cnt = 'Все заказы выполнены. Добавьте новый!'
-    elif not orders:
+    # Page is read with stats, it is empty without in-progress orders.
+    stats, inprog_orders, *_ = await gather(
+        Database.get_orders_stats(),
+        Database.get_inprogress_orders_page(after or 0, before),
+        *([] if only_edit else [query.answer()])
+    )
+    if not stats.total_count:
         cnt = 'Заказы отсутствуют. Добавьте новый!'
+    elif not stats.inprogress_count:
+        cnt = 'Все заказы выполнены. Добавьте новый!'
     else:
-        cnt = 'Текущие заказы:\n\n'
-        full_price = 0
-        for ord in inprog_orders:
+        cnt = f'Текущие заказы ({stats.inprogress_count}):\n\n'
+        for ord in inprog_orders.items:
             cnt += f'{ord.get_short_str()}\n'
-            if ord.price:
-                full_price += ord.price
-        cnt += f'\nИтого: {full_price} руб.'
-    if not only_edit:
-        await query.answer()
+        cnt += f'\nИтого: {stats.inprogress_sum} руб.'
     await query.message.edit_text(cnt, reply_markup=keys.orders(
-        inprog_orders, bool(orders)
+        inprog_orders, bool(stats.total_count)
     ))
 
 
-@bot.callback_query_handler(
-    lambda q: q.data == 'add_order', state='*'
-)
+@callbacks('add_order', state='*')
 @check_admin()
 async def query_add_order(query: types.CallbackQuery, state: FSMContext):
     log.info(
         f'Called by {query.message.chat.mention} ({query.message.chat.id})'
     )
-    await query.answer()
-    await start_add_order(query.message, state, True)
+    await gather(query.answer(), start_add_order(query.message, state, True))
 
 
 @bot.message_handler(commands=['add_order'], state='*')
@@ -239,9 +246,8 @@ async def add_order_price(msg: types.Message, state: FSMContext):
             reply_markup=keys.no_price()
         )
         return
-    await AddOrder.AGENT.set()
-    agents = await Database.get_agents()
-    if agents:
+    _, agents = await gather(AddOrder.AGENT.set(), Database.get_agents_page())
+    if agents.items:
         cnt = 'Выберите агента'
         key = keys.add_order_agents(agents)
         if msg.text == 'Нету цены':
@@ -255,49 +261,77 @@ async def add_order_price(msg: types.Message, state: FSMContext):
     await msg.answer(cnt, reply_markup=key)
 
 
-@bot.callback_query_handler(
-    lambda q: q.data.startswith('agent_order'), state=AddOrder.AGENT
-)
+@callbacks('add_order_agents', state=AddOrder.AGENT, after=int, before=int)
 @check_admin()
-async def verify_add_order(query: types.CallbackQuery, state: FSMContext):
+async def add_order_agents_page(
+    query: types.CallbackQuery, after: int | None = None,
+    before: int | None = None
+):
+    log.info(
+        f'Called by {query.message.chat.mention} ({query.message.chat.id})'
+    )
+    _, agents = await gather(
+        query.answer(), Database.get_agents_page(after or 0, before)
+    )
+    await query.message.edit_reply_markup(keys.add_order_agents(agents))
+
+
+@callbacks('agent_order', state=AddOrder.AGENT, agent_uid=int)
+@check_admin()
+async def verify_add_order(
+    query: types.CallbackQuery, state: FSMContext, agent_uid: int
+):
     log.info(
         f'Called by {query.message.chat.mention} ({query.message.chat.id})'
     )
     cnt = '<b>Подтвердите заказ:</b>\n\n'
-    agent_uid = int(query.data.split('#')[1])
-    agent = await Database.get_agent_by_uid(agent_uid)
-    await state.update_data(agent_uid=agent.uid)
-    data = await state.get_data()
+    _, agent, data = await gather(
+        query.answer(), Database.get_agent_by_uid(agent_uid),
+        state.get_data()
+    )
     if not agent:
         log.warning(
             f'User #{query.message.chat.id} selected unexistsing '
             f'Agent UID: {agent_uid}'
         )
         await state.finish()
-        await query.answer()
         await query.message.edit_text(
             'ОШИБКА: Выбранный Агент не найден!',
             reply_markup=keys.back('orders')
         )
         return
+    await state.update_data(agent_uid=agent.uid)
     await AddOrder.VERIFY.set()
     cnt += f'Цель: {data.get("name")}\n'
     cnt += f'Цена: {data.get("price")}\n'
     cnt += f'Агент: {agent.name}\n\n'
     cnt += 'Создать заказ?'
-    await query.answer()
     await query.message.edit_text(cnt, reply_markup=keys.inline_verify_order())
 
 
-@bot.callback_query_handler(
-    lambda q: q.data == 'verify_order', state=AddOrder.VERIFY
-)
+@callbacks('verify_order', state=AddOrder.VERIFY)
 @check_admin()
 async def add_order_end(query: types.CallbackQuery, state: FSMContext):
     log.info(
         f'Called by {query.message.chat.mention} ({query.message.chat.id})'
     )
     data = await state.get_data()
+    if data.get('orders'):
+        orders = await Database.add_orders(data['orders'])
+        await state.finish()
+        await query.answer()
+        if len(orders) == 1:
+            await query.message.edit_text(
+                f'Заказ #{orders[0].uid} - создан!',
+                reply_markup=keys.order_btn(orders[0].uid)
+            )
+        else:
+            await query.message.edit_text(
+                f'Заказы #{orders[0].uid} - #{orders[-1].uid} '
+                f'({len(orders)}) - созданы!',
+                reply_markup=keys.back('orders', 'К заказам')
+            )
+        return
     if data.get('price') == 'Нету цены':
         price = None
     else:
@@ -305,7 +339,6 @@ async def add_order_end(query: types.CallbackQuery, state: FSMContext):
     order = await Database.add_order(
         data.get('name'), data.get('agent_uid'), price
     )
-    Database.get_order_by_uid.cache_clear()
     await state.finish()
     await query.answer()
     await query.message.edit_text(
@@ -314,98 +347,187 @@ async def add_order_end(query: types.CallbackQuery, state: FSMContext):
     )
 
 
-@bot.callback_query_handler(lambda q: q.data.startswith('order'))
+@callbacks('order', order_uid=int)
 @check_admin()
-async def order(query: types.CallbackQuery):
+async def order(query: types.CallbackQuery, order_uid: int):
     log.info(
         f'Called by {query.message.chat.mention} ({query.message.chat.id})'
     )
-    order_uid = int(query.data.split('#')[1])
-    order = await Database.get_order_by_uid(order_uid)
+    _, order = await gather(
+        query.answer(), Database.get_order_by_uid(order_uid)
+    )
     if order:
-        await query.answer()
         await query.message.edit_text(
             order.get_full_str(), reply_markup=keys.order_ctrl(order)
         )
     else:
-        await query.answer()
         await query.message.edit_text(
             f'<b>ОШИБКА:</b> Заказ #{order_uid} - не найден!',
             reply_markup=keys.back('orders')
         )
 
 
-@bot.callback_query_handler(lambda q: q.data == 'ordres_history')
+@callbacks('ordres_history', after=int, before=int)
 @check_admin()
-async def ordres_history(query: types.CallbackQuery):
+async def ordres_history(
+    query: types.CallbackQuery,
+    after: int | None = None, before: int | None = None
+):
     log.info(
         f'Called by {query.message.chat.mention} ({query.message.chat.id})'
     )
-    orders = await Database.get_orders()
-    if orders:
-        ended_orders = filter(
-            (lambda o: o.end_date),
-            orders
-        )
-        cnt = 'Оплаченые заказы:\n\n'
-        flag = False
-        full_price = 0
-        for ord in ended_orders:
-            flag = True
-            cnt += f'{ord.get_short_str()}\n'
-            if ord.price:
-                full_price += ord.price
-        if not flag:
+    # Totals are from stats, only one page of orders is listed.
+    _, stats, ended = await gather(
+        query.answer(), Database.get_orders_stats(),
+        Database.get_ended_orders_page(after or 0, before)
+    )
+    if stats.total_count:
+        cnt = f'Оплаченые заказы ({stats.paid_count}):\n\n'
+        if not stats.paid_count:
             cnt += 'Пока-что ни один заказ не был оплачен.'
         else:
-            cnt += f'\nИтого: {full_price} руб.'
+            for ord in ended.items:
+                cnt += f'{ord.get_short_str()}\n'
+            cnt += f'\nИтого: {stats.paid_sum} руб.'
     else:
         cnt = 'Заказы отсутствуют.'
-    await query.answer()
-    await query.message.edit_text(cnt, reply_markup=keys.order_history())
+    await query.message.edit_text(
+        cnt, reply_markup=keys.order_history(ended)
+    )
 
 
-@bot.callback_query_handler(lambda q: q.data.startswith('del_order'))
+@callbacks('del_order', order_uid=int)
 @check_admin()
-async def del_order(query: types.CallbackQuery):
+async def del_order(query: types.CallbackQuery, order_uid: int):
     log.info(
         f'Called by {query.message.chat.mention} ({query.message.chat.id})'
     )
-    order_uid = int(query.data.split('#')[1])
-    await Database.del_order(order_uid)
-    Database.get_order_by_uid.cache_clear()
-    await query.answer(f'Заказ #{order_uid} - удалён!', True)
-    await query_orders(query, bot.current_state(), True)
+    if await Database.del_order(order_uid):
+        await query.answer(f'Заказ #{order_uid} - удалён!', True)
+    else:
+        await query.answer(f'Заказ #{order_uid} - не найден!', True)
+    await query_orders(query, bot.current_state(), only_edit=True)
 
 
-@bot.callback_query_handler(lambda q: q.data.startswith('end_order'))
+@callbacks('end_order', order_uid=int)
 @check_admin()
-async def end_order(query: types.CallbackQuery):
+async def end_order(query: types.CallbackQuery, order_uid: int):
     log.info(
         f'Called by {query.message.chat.mention} ({query.message.chat.id})'
     )
-    order_uid = int(query.data.split('#')[1])
-    await Database.end_order(order_uid)
-    Database.get_order_by_uid.cache_clear()
-    await query.answer(f'Заказ #{order_uid} - оплачен!', True)
-    await query_orders(query, bot.current_state(), True)
+    if await Database.end_order(order_uid):
+        await query.answer(f'Заказ #{order_uid} - оплачен!', True)
+    else:
+        await query.answer(
+            f'Заказ #{order_uid} - не найден или уже оплачен!', True
+        )
+    await query_orders(query, bot.current_state(), only_edit=True)
+
 
+def get_select_orders_cnt(selected: list[int]) -> str:
+    '''Returns orders multi-select message text.
+
+    Args:
+        selected (list[int]): Selected orders UIDs.
 
-@bot.callback_query_handler(lambda q: q.data.startswith('set_price_order'))
+    Returns:
+        str: Message text.
+    '''
+    cnt = '<b>Выберите заказы</b>\n\n'
+    if selected:
+        cnt += f'Выбрано: {len(selected)}'
+    else:
+        cnt += 'Ни один заказ не выбран.'
+    return cnt
+
+
+@callbacks('select_orders', state='*', after=int, before=int)
 @check_admin()
-async def start_set_price_order(query: types.CallbackQuery):
+async def select_orders(
+    query: types.CallbackQuery, state: FSMContext,
+    after: int | None = None, before: int | None = None
+):
+    log.info(
+        f'Called by {query.message.chat.mention} ({query.message.chat.id})'
+    )
+    after = after or 0
+    # Without cursor it is new selection, not page switch.
+    if not after and before is None:
+        await state.finish()
+        selected = []
+    else:
+        selected = (await state.get_data()).get('selected', [])
+    await SelectOrders.UIDS.set()
+    _, _, orders = await gather(
+        state.update_data(selected=selected, after=after, before=before),
+        query.answer(), Database.get_inprogress_orders_page(after, before)
+    )
+    await query.message.edit_text(
+        get_select_orders_cnt(selected),
+        reply_markup=keys.orders_select(orders, selected)
+    )
+
+
+@callbacks('sel_order', state=SelectOrders.UIDS, order_uid=int)
+@check_admin()
+async def select_order(
+    query: types.CallbackQuery, state: FSMContext, order_uid: int
+):
+    log.info(
+        f'Called by {query.message.chat.mention} ({query.message.chat.id})'
+    )
+    data = await state.get_data()
+    selected = data.get('selected', [])
+    if order_uid in selected:
+        selected.remove(order_uid)
+    else:
+        selected.append(order_uid)
+    _, _, orders = await gather(
+        state.update_data(selected=selected), query.answer(),
+        Database.get_inprogress_orders_page(
+            data.get('after', 0), data.get('before')
+        )
+    )
+    await query.message.edit_text(
+        get_select_orders_cnt(selected),
+        reply_markup=keys.orders_select(orders, selected)
+    )
+
+
+@callbacks('sel_orders_end', state=SelectOrders.UIDS)
+@callbacks('sel_orders_del', state=SelectOrders.UIDS)
+@check_admin()
+async def select_orders_end(query: types.CallbackQuery, state: FSMContext):
+    log.info(
+        f'Called by {query.message.chat.mention} ({query.message.chat.id})'
+    )
+    selected = (await state.get_data()).get('selected', [])
+    await state.finish()
+    if query.data == 'sel_orders_end':
+        orders = await Database.end_orders(selected)
+        cnt = f'Оплачено заказов: {len(orders)}'
+    else:
+        orders = await Database.del_orders(selected)
+        cnt = f'Удалено заказов: {len(orders)}'
+    await query.answer(cnt, True)
+    await query_orders(query, state, only_edit=True)
+
+
+@callbacks('set_price_order', order_uid=int)
+@check_admin()
+async def start_set_price_order(query: types.CallbackQuery, order_uid: int):
     log.info(
         f'Called by {query.message.chat.mention} ({query.message.chat.id})'
     )
-    order_uid = int(query.data.split('#')[1])
     await OrderPrice.PRICE.set()
     state = bot.current_state()
     await state.update_data(order_uid=order_uid)
     cnt = f'<b>Установка цены для Заказа #{order_uid}</b>\n\n'
     cnt += 'Введите цену в рублях.'
-    key = keys.back(f'order#{order_uid}', 'Отмена')
-    await query.answer()
-    await query.message.edit_text(cnt, reply_markup=key)
+    key = keys.back(pack('order', order_uid), 'Отмена')
+    await gather(
+        query.answer(), query.message.edit_text(cnt, reply_markup=key)
+    )
 
 
 @bot.message_handler(content_types=types.ContentTypes.TEXT, state=OrderPrice.PRICE)
@@ -415,48 +537,38 @@ async def end_set_price_order(msg: types.Message, state: FSMContext):
     data = await state.get_data()
     if not is_digit(msg.text):
         cnt = '<b>ОШИБКА:</b> Введено не число. Попробуйте ещё раз.'
-        key = keys.back(f'order#{data.get("order_uid")}', 'Отмена')
-        await msg.answer(cnt, reply_markup=key)
-        return
-    order = await Database.get_order_by_uid(data.get('order_uid'))
-    if not order:
-        await state.finish()
-        cnt = f'<b>ОШИБКА:</b> Заказ {data.get("order_uid")} не найден!'
-        key = keys.back('orders')
-        await msg.answer(cnt, reply_markup=key)
-        return
-    if order.price:
-        await state.finish()
-        cnt = f'<b>ОШИБКА:</b> Цена для Заказа {data.get("order_uid")} уже установлена!'
-        key = keys.back('orders')
+        key = keys.back(pack('order', data.get('order_uid')), 'Отмена')
         await msg.answer(cnt, reply_markup=key)
         return
     await state.finish()
-    await Database.set_order_price(order.uid, int(msg.text))
-    Database.get_order_by_uid.cache_clear()
-    new_order = await Database.get_order_by_uid(data.get('order_uid'))
-    if not new_order:
-        await state.finish()
-        cnt = f'<b>ОШИБКА:</b> Заказ {data.get("order_uid")} не найден! (ERR2)'
-        key = keys.back('orders')
-        await msg.answer(cnt, reply_markup=key)
+    order = await Database.set_order_price(
+        data.get('order_uid'), int(msg.text)
+    )
+    if not order:
+        if await Database.get_order_by_uid(data.get('order_uid')):
+            cnt = (
+                f'<b>ОШИБКА:</b> Цена для Заказа {data.get("order_uid")} '
+                'уже установлена!'
+            )
+        else:
+            cnt = f'<b>ОШИБКА:</b> Заказ {data.get("order_uid")} не найден!'
+        await msg.answer(cnt, reply_markup=keys.back('orders'))
         return
-    cnt = f'<b>Цена установлена</b>\n\n{new_order.get_full_str()}'
-    await msg.answer(cnt, reply_markup=keys.order_ctrl(new_order))
+    cnt = f'<b>Цена установлена</b>\n\n{order.get_full_str()}'
+    await msg.answer(cnt, reply_markup=keys.order_ctrl(order))
 
 
-@bot.callback_query_handler(lambda q: q.data == 'info_order')
+@callbacks('info_order')
 @check_admin()
 async def order_info_start(query: types.CallbackQuery):
     log.info(
         f'Called by {query.message.chat.mention} ({query.message.chat.id})'
     )
     await OrderInfo.UID.set()
-    await query.answer()
-    await query.message.edit_text(
+    await gather(query.answer(), query.message.edit_text(
         '<b>Поиск заказа</b>\n\nОтправьте номер заказа.',
         reply_markup=keys.back(text='Отмена')
-    )
+    ))
 
 
 @bot.message_handler(
@@ -484,24 +596,91 @@ async def end_order_info(msg: types.Message, state: FSMContext):
         )
 
 
-@bot.callback_query_handler(lambda q: q.data == 'export_order_history')
+async def send_export(msg: types.Message, flt: ExportFilter) -> None:
+    '''Sends orders export, reuses uploaded file if data is not changed.
+
+    Delta export contains orders changed since last delta export
+    to this chat.
+
+    Args:
+        msg (types.Message): Any message in chat.
+        flt (ExportFilter): Orders filter.
+    '''
+    recipient = f'tg:{msg.chat.id}'
+    mark = version = None
+    if flt.delta:
+        mark, changed_after = await gather(
+            Database.get_export_mark(),
+            Database.get_export_watermark(recipient)
+        )
+        flt = ExportFilter(changed_after=changed_after, changed_before=mark)
+    else:
+        version = (flt, await Database.get_export_version())
+        file_id = get_uploaded_export(msg.chat.id, version)
+        if file_id:
+            await msg.answer_document(file_id, caption='Файл готов.')
+            return
+    wait_msg, _, (file, period) = await gather(
+        msg.answer('<code>Файл готовится...</code>'),
+        msg.answer_chat_action(types.ChatActions.UPLOAD_DOCUMENT),
+        make_export_file(Database.iterate_orders(flt), flt)
+    )
+    with file:
+        if period is None:
+            await gather(
+                wait_msg.delete(), msg.answer('Заказы для отчёта не найдены.')
+            )
+        else:
+            _, doc_msg = await gather(
+                wait_msg.delete(), msg.answer_document(
+                    types.InputFile(file, get_export_file_name(period)),
+                    caption='Файл готов.'
+                )
+            )
+    if mark:
+        await Database.set_export_watermark(recipient, mark)
+    elif period:
+        set_uploaded_export(msg.chat.id, version, doc_msg.document.file_id)
+
+
+@callbacks('export_order_history')
+@check_admin()
 async def export_order_history(query: types.CallbackQuery):
     log.info(
         f'Called by {query.message.chat.mention} ({query.message.chat.id})'
     )
-    await query.answer()
-    await query.message.edit_text('<code>Файл готовится...</code>')
-    await query.message.answer_chat_action(types.ChatActions.UPLOAD_DOCUMENT)
-    orders = await Database.get_orders()
-    file = await make_export_file(orders)
-    period = (
-        orders[0].start_date,
-        orders[::-1][0].start_date
-    )
-    file_name = f'Отчёт с {str(period[0])} по {str(period[1])}.xlsx'
-    await query.message.delete()
-    await query.message.answer_document(
-        types.InputFile(file, file_name),
-        caption='Файл готов.'
-    )
-    await query_orders(query, bot.current_state(), True)
+    await gather(query.answer(), query.message.edit_text(
+        'Выберите отчёт или отправьте команду:\n\n' + EXPORT_COMMAND_HELP,
+        reply_markup=keys.export_presets(EXPORT_PRESETS)
+    ))
+
+
+@callbacks('export', preset=str)
+@check_admin()
+async def export_preset(query: types.CallbackQuery, preset: str | None = None):
+    log.info(
+        f'Called by {query.message.chat.mention} ({query.message.chat.id})'
+    )
+    flt = get_export_preset(preset or 'all')
+    await gather(query.answer(), send_export(query.message, flt))
+    await query_orders(query, bot.current_state(), only_edit=True)
+
+
+@bot.message_handler(
+    lambda m: m.text.lower().split(';')[0] == 'export',
+    state='*'
+)
+@check_admin()
+async def export_command(msg: types.Message, state: FSMContext):
+    log.info(f'Called by {msg.chat.mention} ({msg.chat.id})')
+    if state:
+        await state.finish()
+    agents = await Database.get_agent_directory()
+    flt, errors = parse_export_command(msg.text, agents)
+    if flt is None:
+        await msg.answer(
+            '<b>ОШИБКА:</b>\n' + '\n'.join(errors) + '\n\n'
+            + EXPORT_COMMAND_HELP
+        )
+        return
+    await send_export(msg, flt)
@@ -8,7 +8,7 @@ import platform
 from functools import wraps
 
 from aiogram import types
-from pydantic import BaseSettings, Field, PostgresDsn
+from pydantic import BaseSettings, Field, PostgresDsn, validator
 
 
 # Fixing .env file path for Docker.
@@ -24,10 +24,29 @@ class Config(BaseSettings):
     admin_id: int = Field(265300852, env='BOT_ADMINID')
     token: str = Field(..., env='BOT_TOKEN')
     postgres_dsn: PostgresDsn = Field(..., env='BOT_POSTGRESDSN')
+    page_size: int = Field(8, env='BOT_PAGESIZE')
+    cache_size: int = Field(1024, env='BOT_CACHESIZE')
+    cache_ttl: int = Field(300, env='BOT_CACHETTL')
+    export_limit: int = Field(2, env='BOT_EXPORTLIMIT')
+    # Bot API server, like local or fake one. Defaults is Telegram.
+    api_server: str | None = Field(None, env='BOT_APISERVER')
+    # Webhook mode is used if URL is set, long polling otherwise.
+    webhook_url: str | None = Field(None, env='BOT_WEBHOOKURL')
+    webhook_secret: str | None = Field(None, env='BOT_WEBHOOKSECRET')
+    webhook_host: str = Field('0.0.0.0', env='BOT_WEBHOOKHOST')
+    webhook_port: int = Field(8080, env='BOT_WEBHOOKPORT')
+    webhook_workers: int = Field(4, env='BOT_WEBHOOKWORKERS')
+    webhook_queue_size: int = Field(1000, env='BOT_WEBHOOKQUEUESIZE')
 
     class Config:
         env_file = env_file
 
+    @validator('webhook_secret', always=True)
+    def check_webhook_secret(cls, v, values):
+        if values.get('webhook_url') and not v:
+            raise ValueError('Webhook secret is required in webhook mode.')
+        return v
+
 
 cfg = Config()  # type: ignore
 logging.basicConfig(
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+#
+#  MoneyTracker: Database - Hot queries benchmark.
+#  Created by LulzLoL231 at 18/10/26
+#
+#  Compares SQLAlchemy Core + databases + pydantic path with prepared
+#  asyncpg queries. Run from bot dir with BOT_* env or .env file:
+#      python -m database.bench [calls]
+#
+import sys
+import asyncio
+from time import perf_counter
+from typing import Awaitable, Callable
+
+import sqlalchemy as sa
+
+from . import models, queries
+from .main import db
+from .schemas import Agent, Order
+
+
+def select_orders() -> sa.sql.Select:
+    '''Returns SELECT of orders joined with their agents.
+
+    Returns:
+        sa.sql.Select: SQLAlchemy statement.
+    '''
+    return sa.select(
+        *models.order.c,
+        models.agent.c.name.label('agent_name')
+    ).select_from(
+        models.order.outerjoin(
+            models.agent, models.order.c.agent_uid == models.agent.c.uid
+        )
+    )
+
+
+async def bench(
+    name: str, func: Callable[[], Awaitable], calls: int
+) -> float:
+    '''Returns mean call time in microseconds.
+
+    Args:
+        name (str): Case name.
+        func (Callable[[], Awaitable]): Case function.
+        calls (int): Calls count.
+
+    Returns:
+        float: Microseconds per call.
+    '''
+    await func()  # Warm up pool and statements cache.
+    start = perf_counter()
+    for _ in range(calls):
+        await func()
+    per_call = (perf_counter() - start) / calls * 1e6
+    print(f'{name:<32} {per_call:>10.1f} us/call')
+    return per_call
+
+
+async def main(calls: int) -> None:
+    await db.connect()
+    try:
+        uid = await db.db.fetch_val(
+            sa.select(sa.func.max(models.order.c.uid))
+        ) or 0
+
+        async def order_core():
+            stmt = select_orders().where(models.order.c.uid == uid)
+            return db._orders_from_rows(await db.db.fetch_all(stmt))
+
+        async def order_prepared():
+            return db._orders_from_records(
+                await db._fetch(queries.ORDERS_BY_UIDS, [uid]), Order.construct
+            )
+
+        async def inprogress_core():
+            stmt = select_orders().where(
+                models.order.c.end_date == None  # noqa
+            ).order_by(models.order.c.uid)
+            return db._orders_from_rows(await db.db.fetch_all(stmt))
+
+        async def inprogress_prepared():
+            return db._orders_from_records(
+                await db._fetch(queries.INPROGRESS_ORDERS)
+            )
+
+        async def agents_core():
+            stmt = models.agent.select().order_by(models.agent.c.uid)
+            return [Agent.from_orm(i) for i in await db.db.fetch_all(stmt)]
+
+        async def agents_prepared():
+            return [
+                Agent.construct(uid=uid, name=name)
+                for uid, name in await db._fetch(queries.AGENTS)
+            ]
+
+        cases = [
+            ('order by uid', order_core, order_prepared),
+            ('in-progress orders', inprogress_core, inprogress_prepared),
+            ('agents', agents_core, agents_prepared)
+        ]
+        print(f'{calls} calls per case.')
+        for name, core, prepared in cases:
+            old = await bench(f'{name} (core)', core, calls)
+            new = await bench(f'{name} (prepared)', prepared, calls)
+            print(f'{"saving":<32} {old - new:>10.1f} us/call\n')
+    finally:
+        await db.disconnect()
+
+
+if __name__ == '__main__':
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000))
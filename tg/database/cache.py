@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+#
+#  MoneyTracker: Database - Cache.
+#  Created by LulzLoL231 at 18/10/26
+#
+from time import monotonic
+from collections import OrderedDict
+from typing import Generic, Hashable, TypeVar
+
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+
+class TTLCache(Generic[K, V]):
+    '''LRU cache with size bound and entries TTL.
+
+    Args:
+        maxsize (int): Max entries count.
+        ttl (float): Entry time to live in seconds.
+    '''
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # Bumped by every change, see `set`.
+        self.version = 0
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:
+        return self.get(key) is not None
+
+    def get(self, key: K) -> V | None:
+        '''Returns cached value.
+
+        Args:
+            key (K): Entry key.
+
+        Returns:
+            V | None: Value, if cached and not expired.
+        '''
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V, version: int | None = None) -> None:
+        '''Caches value, evicting the least recently used entry if full.
+
+        Value loaded before a change may be stale, so it is cached
+        only if there were no changes since load.
+
+        Args:
+            key (K): Entry key.
+            value (V): Value.
+            version (int, optional): `version` before value load.
+                Defaults is None, value is a change itself.
+        '''
+        if version is None:
+            self.version += 1
+        elif version != self.version:
+            return
+        self._data[key] = (monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: K) -> V | None:
+        '''Evicts entry.
+
+        Args:
+            key (K): Entry key.
+
+        Returns:
+            V | None: Evicted value, if cached.
+        '''
+        self.version += 1
+        entry = self._data.pop(key, None)
+        return entry[1] if entry else None
+
+    def clear(self) -> None:
+        '''Evicts all entries.
+        '''
+        self.version += 1
+        self._data.clear()
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+#
+#  MoneyTracker: Database - Agents directory.
+#  Created by LulzLoL231 at 18/10/26
+#
+from bisect import bisect_left, bisect_right, insort
+from difflib import get_close_matches
+
+from .schemas import Agent
+
+
+class AgentDirectory:
+    '''In-memory copy of agents table with case-folded name index.
+
+    Agents table is small and rarely changed, so it is loaded once
+    and then kept current by writes and change events.
+    '''
+    def __init__(self) -> None:
+        self.loaded = False
+        # Bumped by every change, see `load`.
+        self.version = 0
+        self._by_uid: dict[int, Agent] = {}
+        self._uids: list[int] = []
+        self._by_name: dict[str, list[Agent]] = {}
+        self._names: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self._by_uid)
+
+    @staticmethod
+    def _key(name: str) -> str:
+        return name.strip().casefold()
+
+    def load(self, agents: list[Agent], version: int) -> None:
+        '''Replaces directory content.
+
+        If there were changes since fetch, content may miss them,
+        so directory stays not loaded.
+
+        Args:
+            agents (list[Agent]): All agents.
+            version (int): `version` before agents fetch.
+        '''
+        self._reset()
+        for agent in agents:
+            self._put(agent)
+        self.loaded = version == self.version
+
+    def clear(self) -> None:
+        '''Drops directory content, it must be loaded again.
+        '''
+        self.version += 1
+        self.loaded = False
+        self._reset()
+
+    def add(self, agent: Agent) -> None:
+        '''Adds or replaces agent.
+
+        Args:
+            agent (Agent): Agent.
+        '''
+        self.version += 1
+        if self.loaded:
+            self._put(agent)
+
+    def remove(self, uid: int) -> Agent | None:
+        '''Removes agent.
+
+        Args:
+            uid (int): Agent UID.
+
+        Returns:
+            Agent | None: Removed agent if was in directory.
+        '''
+        self.version += 1
+        return self._pop(uid)
+
+    def _reset(self) -> None:
+        self._by_uid.clear()
+        self._uids.clear()
+        self._by_name.clear()
+        self._names.clear()
+
+    def _put(self, agent: Agent) -> None:
+        self._pop(agent.uid)
+        self._by_uid[agent.uid] = agent
+        insort(self._uids, agent.uid)
+        key = self._key(agent.name)
+        if key not in self._by_name:
+            self._by_name[key] = []
+            insort(self._names, key)
+        insort(self._by_name[key], agent, key=lambda a: a.uid)
+
+    def _pop(self, uid: int) -> Agent | None:
+        agent = self._by_uid.pop(uid, None)
+        if agent is None:
+            return None
+        del self._uids[bisect_left(self._uids, uid)]
+        key = self._key(agent.name)
+        namesakes = self._by_name[key]
+        namesakes.remove(agent)
+        if not namesakes:
+            del self._by_name[key]
+            del self._names[bisect_left(self._names, key)]
+        return agent
+
+    def get(self, uid: int) -> Agent | None:
+        '''Returns agent by UID.
+
+        Args:
+            uid (int): Agent UID.
+
+        Returns:
+            Agent | None: Agent if exists.
+        '''
+        return self._by_uid.get(uid)
+
+    def all(self) -> list[Agent]:
+        '''Returns all agents ordered by UID.
+
+        Returns:
+            list[Agent]: Array of agents.
+        '''
+        return [self._by_uid[uid] for uid in self._uids]
+
+    def slice(
+        self, after: int, before: int | None, limit: int
+    ) -> list[Agent]:
+        '''Returns agents by keyset, for `Database._make_page`.
+
+        Args:
+            after (int): Agents with UID greater than this.
+            before (int | None): Agents with UID less than this, descending.
+            limit (int): Max agents count.
+
+        Returns:
+            list[Agent]: Array of agents.
+        '''
+        if before is not None:
+            end = bisect_left(self._uids, before)
+            uids = self._uids[max(end - limit, 0):end][::-1]
+        else:
+            start = bisect_right(self._uids, after)
+            uids = self._uids[start:start + limit]
+        return [self._by_uid[uid] for uid in uids]
+
+    def find(self, name: str) -> Agent | None:
+        '''Returns agent by name, case-insensitive.
+
+        Of namesakes, the oldest agent is returned.
+
+        Args:
+            name (str): Agent name.
+
+        Returns:
+            Agent | None: Agent if exists.
+        '''
+        namesakes = self._by_name.get(self._key(name))
+        return namesakes[0] if namesakes else None
+
+    def match(
+        self, name: str, limit: int = 3, cutoff: float = 0.6
+    ) -> list[Agent]:
+        '''Returns agents with similar names, most similar first.
+
+        Args:
+            name (str): Agent name, maybe with typos.
+            limit (int, optional): Max names count. Defaults to 3.
+            cutoff (float, optional): Min similarity in [0, 1].
+                Defaults to 0.6.
+
+        Returns:
+            list[Agent]: Array of agents.
+        '''
+        keys = get_close_matches(self._key(name), self._names, limit, cutoff)
+        return [self._by_name[key][0] for key in keys]
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+#
+#  MoneyTracker: Database - Batch loader.
+#  Created by LulzLoL231 at 18/10/26
+#
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+
+K = TypeVar('K', bound=Hashable)
+V = TypeVar('V')
+
+
+class BatchLoader(Generic[K, V]):
+    '''Gathers keys requested in one event loop tick into one batch call.
+
+    Args:
+        batch (Callable[[list[K]], Awaitable[dict[K, V]]]): Loads values
+            by keys, missing keys are resolved to None.
+    '''
+    def __init__(
+        self, batch: Callable[[list[K]], Awaitable[dict[K, V]]]
+    ) -> None:
+        self.batch = batch
+        self._pending: dict[K, asyncio.Future] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def load(self, key: K) -> V | None:
+        '''Returns value by key, loaded with other keys of this tick.
+
+        Args:
+            key (K): Key.
+
+        Returns:
+            V | None: Value if exists.
+        '''
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            if not self._pending:
+                loop.call_soon(self._dispatch)
+            future = loop.create_future()
+            self._pending[key] = future
+        # One cancelled caller must not cancel the others.
+        return await asyncio.shield(future)
+
+    def _dispatch(self) -> None:
+        pending, self._pending = self._pending, {}
+        task = asyncio.ensure_future(self._run(pending))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, pending: dict[K, asyncio.Future]) -> None:
+        try:
+            values = await self.batch(list(pending))
+        except asyncio.CancelledError:
+            for future in pending.values():
+                future.cancel()
+            raise
+        except Exception as e:
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(e)
+                    # Marks exception as retrieved, if all callers are
+                    # cancelled.
+                    future.exception()
+            return
+        for key, future in pending.items():
+            if not future.done():
+                future.set_result(values.get(key))
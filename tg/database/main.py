@@ -4,19 +4,31 @@
 #  Created by LulzLoL231 27/06/22
 #
 import logging
-from datetime import date
-from typing import Literal
+from uuid import uuid4
+from datetime import date, datetime
+from typing import AsyncIterator, Callable, Literal
 
 import sqlalchemy as sa
-from async_lru import alru_cache
-from databases import DatabaseURL, Database as DB
+from sqlalchemy.dialects import postgresql
+from databases import Database as DB
 
 from config import cfg
-from . import models
-from .schemas import Agent, Order
+from . import models, migrations, queries
+from .cache import TTLCache
+from .dashboard import Dashboard
+from .directory import AgentDirectory
+from .flight import SingleFlight
+from .loader import BatchLoader
+from .notify import CHANNEL, ChangeListener, make_payload
+from .schemas import (
+    Agent, ExportFilter, Order, OrderRow, OrdersStats, Page
+)
 
 
 database = DB(str(cfg.postgres_dsn))
+flight = SingleFlight()
+# Orders write time, not its transaction start, see `get_export_mark`.
+updated_at = sa.func.clock_timestamp
 
 
 class Database:
@@ -24,27 +36,89 @@ class Database:
 
     def __init__(self) -> None:
         self.db = database
-
-    @classmethod
-    def _create_tables(cls):
-        '''Creates tables from metadata.
-        '''
-        cls.log.debug('Creating tables...')
-        dsn = DatabaseURL(str(cfg.postgres_dsn)).replace(driver='psycopg2')
-        engine = sa.create_engine(str(dsn), echo=cfg.DEBUG)
-        models.metadata.create_all(engine)
+        # Changed by write methods after commit only, so they never
+        # serve rolled back data.
+        self.agents = AgentDirectory()
+        self.dashboard = Dashboard()
+        self.orders_cache: TTLCache[int, Order] = TTLCache(
+            cfg.cache_size, cfg.cache_ttl
+        )
+        # Batches get_order_by_uid calls made in one event loop tick.
+        self.orders_loader: BatchLoader[int, Order] = BatchLoader(
+            self._load_orders
+        )
+        # Marks own change events, they are already applied to caches.
+        self.origin = uuid4().hex
+        self.listener = ChangeListener(
+            str(cfg.postgres_dsn), self._on_change, self._clear_caches
+        )
 
     async def connect(self):
-        '''Connect to PostgreSQL.
+        '''Connect to PostgreSQL and listen for changes by other bots.
         '''
         await self.db.connect()
+        await self.listener.start()
+
+    async def migrate(self) -> int:
+        '''Migrates DB schema to latest version.
+
+        Returns:
+            int: Schema version.
+        '''
+        return await migrations.migrate(self.db)
 
     async def disconnect(self):
         '''Disconnect from PostgreSQL.
         '''
+        await self.listener.stop()
         await self.db.disconnect()
 
-    @database.transaction()
+    def _clear_caches(self) -> None:
+        '''Evicts all cached entries.
+        '''
+        self.agents.clear()
+        self.orders_cache.clear()
+        self.dashboard.clear()
+        flight.forget()
+
+    def _on_change(self, event: dict) -> None:
+        '''Evicts entries changed by other process.
+
+        Args:
+            event (dict): Change event, see `_notify`.
+        '''
+        if event.get('origin') == self.origin:
+            return
+        self.log.debug(f'Got change event: {event}')
+        flight.forget()
+        if event.get('table') == models.agent.name:
+            # Event has no agent names, directory is reloaded on next read.
+            self.agents.clear()
+        elif event.get('table') == models.order.name:
+            # Event has no order state, dashboard is reloaded on next read.
+            self.dashboard.clear()
+            if event.get('uids') is None:
+                self.orders_cache.clear()
+            else:
+                for uid in event['uids']:
+                    self.orders_cache.pop(uid)
+
+    async def _notify(self, table: sa.Table, uids: list[int] | None) -> None:
+        '''Publishes change event to other processes.
+
+        Must be called in write transaction, so event is sent on commit.
+
+        Args:
+            table (sa.Table): Changed table.
+            uids (list[int] | None): Changed rows UIDs, None for "all rows".
+        '''
+        await self.db.execute(
+            sa.select(sa.func.pg_notify(
+                CHANNEL, make_payload(self.origin, table.name, uids)
+            ))
+        )
+
+    @flight.invalidates
     async def add_agent(self, name: str) -> Agent:
         '''Add a new agent to DB.
 
@@ -56,10 +130,29 @@ class Database:
         '''
         self.log.debug(f'Called with args: ({name})')
         stmt1 = models.agent.insert().values(name=name)
-        uid = await self.db.execute(stmt1, {'name': name})
-        return Agent(uid=uid, name=name)
+        async with self.db.transaction():
+            uid = await self.db.execute(stmt1, {'name': name})
+            await self._notify(models.agent, [uid])
+        agent = Agent(uid=uid, name=name)
+        self.agents.add(agent)
+        return agent
+
+    @flight
+    async def get_agent_directory(self) -> AgentDirectory:
+        '''Returns agents directory, loads it on first call.
+
+        Returns:
+            AgentDirectory: All agents.
+        '''
+        if not self.agents.loaded:
+            self.log.debug('Loading agents directory.')
+            version = self.agents.version
+            records = await self._fetch(queries.AGENTS)
+            self.agents.load([
+                Agent.construct(uid=uid, name=name) for uid, name in records
+            ], version)
+        return self.agents
 
-    @alru_cache
     async def get_agent_by_uid(self, uid: int) -> Agent | None:
         '''Returns agent by UID.
 
@@ -70,73 +163,409 @@ class Database:
             Agent | None: Agent if exists.
         '''
         self.log.debug(f'Called with args: ({uid})')
-        stmt = models.agent.select().where(models.agent.c.uid == uid)
-        res = await self.db.fetch_one(stmt)
-        if res:
-            return Agent.from_orm(res)
-        return None
+        return (await self.get_agent_directory()).get(uid)
 
-    async def get_orders(self) -> list[Order]:
-        '''Returns all orders.
+    @staticmethod
+    def _make_page(
+        items: list, after: int, before: int | None, limit: int
+    ) -> Page:
+        '''Makes Page from items fetched by keyset with one extra item.
+
+        Args:
+            items (list): Fetched items.
+            after (int): Cursor used for fetch.
+            before (int | None): Cursor used for fetch.
+            limit (int): Page size.
+
+        Returns:
+            Page: Page of items.
+        '''
+        extra = len(items) > limit
+        items = items[:limit]
+        if before is not None:
+            return Page(items=items[::-1], has_prev=extra, has_next=True)
+        return Page(items=items, has_prev=after > 0, has_next=extra)
+
+    @staticmethod
+    def _uid_any(column: sa.Column, uids: list[int]) -> sa.sql.ColumnElement:
+        '''Returns "column = ANY(:uids)" condition.
+
+        Args:
+            column (sa.Column): UID column.
+            uids (list[int]): Array of UIDs.
+
+        Returns:
+            sa.sql.ColumnElement: SQLAlchemy condition.
+        '''
+        return column == sa.any_(
+            sa.literal(list(uids), postgresql.ARRAY(sa.INTEGER))
+        )
+
+    def _orders_from_rows(self, rows) -> list[Order]:
+        '''Builds orders from joined rows, sharing one Agent per UID.
+
+        Args:
+            rows: Rows with orders columns and "agent_name".
 
         Returns:
             list[Order]: Array of orders.
         '''
-        self.log.debug('Called!')
+        agents: dict[int, Agent] = {}
+        orders = []
+        for row in rows:
+            if row.agent_name is None:
+                self.log.error(
+                    f'Order #{row.uid} have nonexistent '
+                    f'Agent UID #{row.agent_uid}')
+                continue
+            agent = agents.get(row.agent_uid)
+            if agent is None:
+                agent = Agent(uid=row.agent_uid, name=row.agent_name)
+                agents[row.agent_uid] = agent
+            orders.append(Order(
+                uid=row.uid,
+                name=row.name,
+                price=row.price,
+                agent_uid=row.agent_uid,
+                agent=agent,
+                start_date=row.start_date,
+                end_date=row.end_date
+            ))
+        return orders
+
+    async def _fetch(self, query: str, *args) -> list:
+        '''Runs query from `queries` right on asyncpg connection.
+
+        asyncpg prepares query once per connection and reuses it.
+        Connection may be shared by tasks of one context, so query
+        takes its lock, like `databases` queries do.
+
+        Args:
+            query (str): SQL query with $N placeholders.
+            *args: Query arguments.
+
+        Returns:
+            list: Array of asyncpg records.
+        '''
+        async with self.db.connection() as conn:
+            async with conn._query_lock:
+                return await conn.raw_connection.fetch(query, *args)
+
+    async def iterate(
+        self, query: str, *args, size: int = 1000
+    ) -> AsyncIterator[list]:
+        '''Runs query from `queries` with server-side cursor.
+
+        Only one chunk of rows is in memory at a time. Connection is held
+        until iteration ends.
+
+        Args:
+            query (str): SQL query with $N placeholders.
+            *args: Query arguments.
+            size (int, optional): Rows per chunk. Defaults to 1000.
+
+        Yields:
+            list: Array of asyncpg records.
+        '''
+        async with self.db.connection() as conn:
+            async with conn.transaction():
+                # Lock is not held between chunks, so other queries
+                # of shared connection are not blocked by export.
+                async with conn._query_lock:
+                    cursor = await conn.raw_connection.cursor(query, *args)
+                while True:
+                    async with conn._query_lock:
+                        records = await cursor.fetch(size)
+                    if not records:
+                        return
+                    yield records
+
+    def _orders_from_records(
+        self, records: list, factory: Callable = OrderRow
+    ) -> list:
+        '''Builds orders from `queries` records, sharing one Agent per UID.
+
+        Records are already typed by asyncpg, so models are not validated.
+
+        Args:
+            records (list): Array of asyncpg records.
+            factory (Callable, optional): Order class or constructor.
+                Defaults is OrderRow.
+
+        Returns:
+            list: Array of orders, made by factory.
+        '''
+        agents: dict[int, Agent] = {}
         orders = []
-        stmt = models.order.select()
-        fetch = await self.db.fetch_all(stmt)
-        if fetch:
-            for ord in fetch:
-                agent = await self.get_agent_by_uid(ord.agent_uid)
-                if agent:
-                    orders.append(Order(
-                        uid=ord.uid,
-                        name=ord.name,
-                        price=ord.price,
-                        agent_uid=ord.agent_uid,
-                        agent=agent,
-                        start_date=ord.start_date,
-                        end_date=ord.end_date
-                    ))
-                else:
-                    self.log.error(
-                        f'Order #{ord.uid} have nonexistent '
-                        f'Agent UID #{ord.agent_uid}')
+        for uid, name, price, agent_uid, start_date, end_date, agent_name \
+                in records:
+            if agent_name is None:
+                self.log.error(
+                    f'Order #{uid} have nonexistent Agent UID #{agent_uid}'
+                )
+                continue
+            agent = agents.get(agent_uid)
+            if agent is None:
+                agent = Agent.construct(uid=agent_uid, name=agent_name)
+                agents[agent_uid] = agent
+            orders.append(factory(
+                uid=uid,
+                name=name,
+                price=price,
+                agent_uid=agent_uid,
+                agent=agent,
+                start_date=start_date,
+                end_date=end_date
+            ))
         return orders
 
-    async def get_inprogress_orders(self) -> list[Order]:
+    @staticmethod
+    def _stats_from_record(record) -> OrdersStats:
+        '''Builds OrdersStats from `queries` stats record.
+
+        Args:
+            record: asyncpg record.
+
+        Returns:
+            OrdersStats: Orders stats.
+        '''
+        agent_uid, inprogress_count, inprogress_sum, \
+            paid_count, paid_sum = record
+        return OrdersStats.construct(
+            agent_uid=agent_uid,
+            inprogress_count=inprogress_count,
+            inprogress_sum=inprogress_sum,
+            paid_count=paid_count,
+            paid_sum=paid_sum
+        )
+
+    async def _fetch_changed_orders(self, stmt) -> list[Order]:
+        '''Runs orders INSERT/UPDATE/DELETE, returns changed orders.
+
+        Changed rows are joined with agents in the same query.
+
+        Args:
+            stmt: SQLAlchemy DML statement on orders table.
+
+        Returns:
+            list[Order]: Changed orders.
+        '''
+        changed = stmt.returning(*models.order.c).cte('changed')
+        select = sa.select(
+            *changed.c,
+            models.agent.c.name.label('agent_name')
+        ).select_from(
+            changed.outerjoin(
+                models.agent, changed.c.agent_uid == models.agent.c.uid
+            )
+        ).order_by(changed.c.uid)
+        fetch = await self.db.fetch_all(select)
+        return self._orders_from_rows(fetch)
+
+    @flight
+    async def get_orders(self) -> list[OrderRow]:
+        '''Returns all orders.
+
+        Returns:
+            list[OrderRow]: Array of orders.
+        '''
+        self.log.debug('Called!')
+        records = await self._fetch(queries.ORDERS)
+        return self._orders_from_records(records)
+
+    async def iterate_orders(
+        self, flt: ExportFilter | None = None, size: int = 1000
+    ) -> AsyncIterator[list[OrderRow]]:
+        '''Streams orders in chunks.
+
+        Args:
+            flt (ExportFilter, optional): Orders filter. Defaults is None.
+            size (int, optional): Orders per chunk. Defaults to 1000.
+
+        Yields:
+            list[OrderRow]: Array of orders.
+        '''
+        self.log.debug(f'Called with args: ({flt}, {size})')
+        if flt is None:
+            query, args = queries.ORDERS, []
+        else:
+            query, args = queries.filtered_orders(
+                **flt.dict(exclude={'delta'})
+            )
+        async for records in self.iterate(query, *args, size=size):
+            yield self._orders_from_records(records)
+
+    @flight
+    async def get_inprogress_orders(self) -> list[OrderRow]:
         '''Returns all not ended orders.
 
         Returns:
-            list[Order]: Array of orders.
+            list[OrderRow]: Array of orders.
         '''
         self.log.debug('Called!')
-        orders = []
-        stmt = models.order.select().where(
-            models.order.c.end_date == None  # noqa
+        records = await self._fetch(queries.INPROGRESS_ORDERS)
+        return self._orders_from_records(records)
+
+    @flight
+    async def get_inprogress_orders_page(
+        self, after: int = 0, before: int | None = None,
+        limit: int = cfg.page_size
+    ) -> Page[OrderRow]:
+        '''Returns page of not ended orders.
+
+        Args:
+            after (int, optional): Orders after this UID. Defaults is 0.
+            before (int, optional): Orders before this UID. Defaults is None.
+            limit (int, optional): Page size. Defaults is cfg.page_size.
+
+        Returns:
+            Page[OrderRow]: Page of orders.
+        '''
+        self.log.debug(f'Called with args: ({after}, {before}, {limit})')
+        if before is not None:
+            records = await self._fetch(
+                queries.INPROGRESS_ORDERS_BEFORE, before, limit + 1
+            )
+        else:
+            records = await self._fetch(
+                queries.INPROGRESS_ORDERS_AFTER, after, limit + 1
+            )
+        if not records and (after or before is not None):
+            return await self.get_inprogress_orders_page(limit=limit)
+        return self._make_page(
+            self._orders_from_records(records), after, before, limit
         )
-        fetch = await self.db.fetch_all(stmt)
-        if fetch:
-            for ord in fetch:
-                agent = await self.get_agent_by_uid(ord.agent_uid)
-                if agent:
-                    orders.append(Order(
-                        uid=ord.uid,
-                        name=ord.name,
-                        price=ord.price,
-                        agent_uid=ord.agent_uid,
-                        agent=agent,
-                        start_date=ord.start_date,
-                        end_date=ord.end_date
-                    ))
-                else:
-                    self.log.error(
-                        f'Order #{ord.uid} have nonexistent '
-                        f'Agent UID #{ord.agent_uid}')
-        return orders
 
-    @database.transaction()
+    @flight
+    async def get_dashboard(self) -> Dashboard:
+        '''Returns in-progress orders dashboard, loads it on first call.
+
+        Returns:
+            Dashboard: In-progress orders summary.
+        '''
+        if not self.dashboard.loaded:
+            self.log.debug('Loading dashboard.')
+            version = self.dashboard.version
+            records = await self._fetch(queries.INPROGRESS_ORDERS)
+            self.dashboard.load(self._orders_from_records(records), version)
+        return self.dashboard
+
+    async def get_export_mark(self) -> datetime:
+        '''Returns upper changes bound for delta export.
+
+        Briefly locks orders against writes, so all writes with updated_at
+        up to returned time are committed, and later writes get greater
+        updated_at.
+
+        Returns:
+            datetime: Current time.
+        '''
+        self.log.debug('Called!')
+        async with self.db.connection() as conn:
+            async with conn.transaction(), conn._query_lock:
+                await conn.raw_connection.execute(queries.LOCK_ORDERS)
+                return await conn.raw_connection.fetchval(queries.CLOCK)
+
+    async def get_export_watermark(self, recipient: str) -> datetime | None:
+        '''Returns last delta export changes bound.
+
+        Args:
+            recipient (str): Recipient ID, like "tg:<chat_id>".
+
+        Returns:
+            datetime | None: Watermark, None if there was no exports.
+        '''
+        self.log.debug(f'Called with args: ({recipient})')
+        records = await self._fetch(queries.EXPORT_WATERMARK, recipient)
+        return records[0][0] if records else None
+
+    async def set_export_watermark(
+        self, recipient: str, exported_at: datetime
+    ) -> None:
+        '''Saves delta export changes bound, after export is delivered.
+
+        Args:
+            recipient (str): Recipient ID, like "tg:<chat_id>".
+            exported_at (datetime): Bound from `get_export_mark`.
+        '''
+        self.log.debug(f'Called with args: ({recipient}, {exported_at})')
+        await self._fetch(
+            queries.SET_EXPORT_WATERMARK, recipient, exported_at
+        )
+
+    @flight
+    async def get_export_version(self) -> tuple:
+        '''Returns orders data version for exports cache.
+
+        Returns:
+            tuple: Max UID, count and last modification time of orders.
+        '''
+        self.log.debug('Called!')
+        return tuple((await self._fetch(queries.EXPORT_VERSION))[0])
+
+    @flight
+    async def get_ended_orders_page(
+        self, after: int = 0, before: int | None = None,
+        limit: int = cfg.page_size
+    ) -> Page[OrderRow]:
+        '''Returns page of ended (paid) orders.
+
+        Args:
+            after (int, optional): Orders after this UID. Defaults is 0.
+            before (int, optional): Orders before this UID. Defaults is None.
+            limit (int, optional): Page size. Defaults is cfg.page_size.
+
+        Returns:
+            Page[OrderRow]: Page of orders.
+        '''
+        self.log.debug(f'Called with args: ({after}, {before}, {limit})')
+        if before is not None:
+            records = await self._fetch(
+                queries.ENDED_ORDERS_BEFORE, before, limit + 1
+            )
+        else:
+            records = await self._fetch(
+                queries.ENDED_ORDERS_AFTER, after, limit + 1
+            )
+        if not records and (after or before is not None):
+            return await self.get_ended_orders_page(limit=limit)
+        return self._make_page(
+            self._orders_from_records(records), after, before, limit
+        )
+
+    @flight
+    async def get_orders_stats(
+        self, agent_uid: int | None = None
+    ) -> OrdersStats:
+        '''Returns orders count & price sum, split by in-progress and paid.
+
+        Args:
+            agent_uid (int, optional): Count only this Agent orders.
+
+        Returns:
+            OrdersStats: Orders stats.
+        '''
+        self.log.debug(f'Called with args: ({agent_uid})')
+        if agent_uid is None:
+            records = await self._fetch(queries.ORDERS_STATS)
+        else:
+            records = await self._fetch(
+                queries.AGENT_ORDERS_STATS, agent_uid
+            )
+        return self._stats_from_record(records[0])
+
+    @flight
+    async def get_orders_stats_by_agent(self) -> dict[int, OrdersStats]:
+        '''Returns orders stats grouped by Agent.
+
+        Returns:
+            dict[int, OrdersStats]: Stats by Agent UID.
+        '''
+        self.log.debug('Called!')
+        records = await self._fetch(queries.ORDERS_STATS_BY_AGENT)
+        return {i[0]: self._stats_from_record(i) for i in records}
+
+    @flight.invalidates
     async def del_agent(self, uid: int) -> Literal[True]:
         '''Deletes Agent from DB.
 
@@ -148,10 +577,13 @@ class Database:
         '''
         self.log.debug(f'Called with args: ({uid})')
         stmt = models.agent.delete().where(models.agent.c.uid == uid)
-        await self.db.execute(stmt)
+        async with self.db.transaction():
+            await self.db.execute(stmt)
+            await self._notify(models.agent, [uid])
+        self.agents.remove(uid)
         return True
 
-    @database.transaction()
+    @flight.invalidates
     async def add_order(
         self, name: str, agent_uid: int, price: int | None = None
     ) -> Order:
@@ -166,17 +598,44 @@ class Database:
             Order: A created Order.
         '''
         self.log.debug(f'Called with args: ({name}, {agent_uid}, {price})')
-        values = {
-            'name': name, 'price': price, 'agent_uid': agent_uid,
-            'start_date': date.today()
-        }
-        stmt = models.order.insert().values(**values)
-        uid = await self.db.execute(stmt, values)
-        agent = await self.get_agent_by_uid(agent_uid)
-        return Order(
-            uid=uid, name=name, price=price, agent_uid=agent_uid,
-            agent=agent, start_date=values['start_date']
+        stmt = models.order.insert().values(
+            name=name, price=price, agent_uid=agent_uid,
+            start_date=date.today(), updated_at=updated_at()
         )
+        async with self.db.transaction():
+            order = (await self._fetch_changed_orders(stmt))[0]
+            await self._notify(models.order, [order.uid])
+        self.orders_cache.set(order.uid, order)
+        self.dashboard.apply(order)
+        return order
+
+    @flight.invalidates
+    async def add_orders(self, orders: list[dict]) -> list[Order]:
+        '''Add many Orders to DB with one INSERT.
+
+        Args:
+            orders (list[dict]): Array of dicts with "name", "agent_uid"
+                and optional "price" keys.
+
+        Returns:
+            list[Order]: Created Orders.
+        '''
+        self.log.debug(f'Called with {len(orders)} orders.')
+        if not orders:
+            return []
+        start_date = date.today()
+        stmt = models.order.insert().values([{
+            'name': o['name'], 'price': o.get('price'),
+            'agent_uid': o['agent_uid'], 'start_date': start_date,
+            'updated_at': updated_at()
+        } for o in orders])
+        async with self.db.transaction():
+            created = await self._fetch_changed_orders(stmt)
+            await self._notify(models.order, [o.uid for o in created])
+        for order in created:
+            self.orders_cache.set(order.uid, order)
+            self.dashboard.apply(order)
+        return created
 
     async def get_agents(self) -> list[Agent]:
         '''Returns all agents.
@@ -185,11 +644,31 @@ class Database:
             list[Agents]: Array of agents.
         '''
         self.log.debug('Called!')
-        stmt = models.agent.select()
-        fetch = await self.db.fetch_all(stmt)
-        return [Agent.from_orm(i) for i in fetch]
+        return (await self.get_agent_directory()).all()
+
+    async def get_agents_page(
+        self, after: int = 0, before: int | None = None,
+        limit: int = cfg.page_size
+    ) -> Page[Agent]:
+        '''Returns page of agents.
+
+        Args:
+            after (int, optional): Agents after this UID. Defaults is 0.
+            before (int, optional): Agents before this UID. Defaults is None.
+            limit (int, optional): Page size. Defaults is cfg.page_size.
+
+        Returns:
+            Page[Agent]: Page of agents.
+        '''
+        self.log.debug(f'Called with args: ({after}, {before}, {limit})')
+        agents = (await self.get_agent_directory()).slice(
+            after, before, limit + 1
+        )
+        if not agents and (after or before is not None):
+            return await self.get_agents_page(limit=limit)
+        return self._make_page(agents, after, before, limit)
 
-    @alru_cache
+    @flight
     async def get_order_by_uid(self, uid: int) -> Order | None:
         '''Returns Order by UID.
 
@@ -200,82 +679,153 @@ class Database:
             Order | None: Order if exists.
         '''
         self.log.debug(f'Called with args: ({uid})')
-        stmt = models.order.select().where(models.order.c.uid == uid)
-        fetch = await self.db.fetch_one(stmt)
-        if fetch:
-            agent = await self.get_agent_by_uid(fetch.agent_uid)
-            if agent:
-                return Order(
-                    uid=fetch.uid,
-                    name=fetch.name,
-                    price=fetch.price,
-                    agent_uid=fetch.agent_uid,
-                    agent=agent,
-                    start_date=fetch.start_date,
-                    end_date=fetch.end_date
-                )
-            else:
-                self.log.error(
-                    f'Order #{fetch.uid} have nonexistent '
-                    f'Agent UID #{fetch.agent_uid}')
-        return None
+        order = self.orders_cache.get(uid)
+        if order:
+            return order
+        return await self.orders_loader.load(uid)
+
+    async def _load_orders(self, uids: list[int]) -> dict[int, Order]:
+        '''Loads orders by UIDs with one query, for `orders_loader`.
+
+        Args:
+            uids (list[int]): Orders UIDs.
+
+        Returns:
+            dict[int, Order]: Found orders by UID.
+        '''
+        self.log.debug(f'Called with args: ({uids})')
+        version = self.orders_cache.version
+        orders = self._orders_from_records(
+            await self._fetch(queries.ORDERS_BY_UIDS, uids), Order.construct
+        )
+        for order in orders:
+            self.orders_cache.set(order.uid, order, version)
+        return {order.uid: order for order in orders}
 
-    @database.transaction()
-    async def end_order(self, uid: int) -> Literal[True]:
-        '''Set end_date to Order by provided uid.
+    @flight.invalidates
+    async def end_order(self, uid: int) -> Order | None:
+        '''Set end_date to not ended Order by provided uid.
 
         Args:
             uid (int): Order UID.
 
         Returns:
-            Literal[True]: Always True.
+            Order | None: Ended Order, None if not found or already ended.
         '''
         self.log.debug(f'Called with args: ({uid})')
-        end_date = date.today()
         stmt = models.order.update().where(
             models.order.c.uid == uid
+        ).where(
+            models.order.c.end_date == None  # noqa
         ).values(
-            end_date=end_date
+            end_date=date.today(), updated_at=updated_at()
         )
-        await self.db.execute(stmt, {
-            'uid': uid, 'end_date': end_date
-        })
-        return True
-
-    @database.transaction()
-    async def del_order(self, uid: int) -> Literal[True]:
+        async with self.db.transaction():
+            orders = await self._fetch_changed_orders(stmt)
+            if not orders:
+                return None
+            await self._notify(models.order, [uid])
+        self.orders_cache.set(uid, orders[0])
+        self.dashboard.apply(orders[0])
+        return orders[0]
+
+    @flight.invalidates
+    async def del_order(self, uid: int) -> Order | None:
         '''Deletes order from DB.
 
         Args:
             uid (int): Order UID.
 
         Returns:
-            Literal[True]: Always True.
+            Order | None: Deleted Order, None if not found.
         '''
         self.log.debug(f'Called with args: ({uid})')
         stmt = models.order.delete().where(models.order.c.uid == uid)
-        await self.db.execute(stmt)
-        return True
+        async with self.db.transaction():
+            orders = await self._fetch_changed_orders(stmt)
+            if orders:
+                await self._notify(models.order, [uid])
+        self.orders_cache.pop(uid)
+        self.dashboard.discard(uid)
+        return orders[0] if orders else None
+
+    @flight.invalidates
+    async def end_orders(self, uids: list[int]) -> list[Order]:
+        '''Set end_date to not ended Orders with one UPDATE.
 
-    @database.transaction()
-    async def set_order_price(self, uid: int, price: int) -> Literal[True]:
-        '''Sets order price.
+        Args:
+            uids (list[int]): Orders UIDs.
+
+        Returns:
+            list[Order]: Ended Orders.
+        '''
+        self.log.debug(f'Called with args: ({uids})')
+        stmt = models.order.update().where(
+            self._uid_any(models.order.c.uid, uids)
+        ).where(
+            models.order.c.end_date == None  # noqa
+        ).values(
+            end_date=date.today(), updated_at=updated_at()
+        )
+        async with self.db.transaction():
+            ended = await self._fetch_changed_orders(stmt)
+            if ended:
+                await self._notify(models.order, [o.uid for o in ended])
+        for order in ended:
+            self.orders_cache.set(order.uid, order)
+            self.dashboard.apply(order)
+        return ended
+
+    @flight.invalidates
+    async def del_orders(self, uids: list[int]) -> list[Order]:
+        '''Deletes Orders with one DELETE.
+
+        Args:
+            uids (list[int]): Orders UIDs.
+
+        Returns:
+            list[Order]: Deleted Orders.
+        '''
+        self.log.debug(f'Called with args: ({uids})')
+        stmt = models.order.delete().where(
+            self._uid_any(models.order.c.uid, uids)
+        )
+        async with self.db.transaction():
+            deleted = await self._fetch_changed_orders(stmt)
+            if deleted:
+                await self._notify(models.order, [o.uid for o in deleted])
+        for order in deleted:
+            self.orders_cache.pop(order.uid)
+            self.dashboard.discard(order.uid)
+        return deleted
+
+    @flight.invalidates
+    async def set_order_price(self, uid: int, price: int) -> Order | None:
+        '''Sets order price, if it is not set yet.
 
         Args:
             uid (int): Order UID.
             price (int): Order price.
 
         Returns:
-            Literal[True]: Always True.
+            Order | None: Updated Order, None if not found or price is set.
         '''
         self.log.debug(f'Called with args: ({uid}, {price})')
         stmt = models.order.update().where(
             models.order.c.uid == uid
+        ).where(
+            models.order.c.price == None  # noqa
         ).values({
-            'price': price
+            'price': price, 'updated_at': updated_at()
         })
-        await self.db.execute(stmt)
-        return True
+        async with self.db.transaction():
+            orders = await self._fetch_changed_orders(stmt)
+            if not orders:
+                return None
+            await self._notify(models.order, [uid])
+        self.orders_cache.set(uid, orders[0])
+        self.dashboard.apply(orders[0])
+        return orders[0]
 
 
 db = Database()
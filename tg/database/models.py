@@ -22,6 +22,10 @@ order = sa.Table(
     ),
     sa.Column('start_date', sa.DATE, default=date.today),
     sa.Column('end_date', sa.DATE, nullable=True, default=None),
+    sa.Column(
+        'updated_at', sa.TIMESTAMP(timezone=True),
+        nullable=False, server_default=sa.func.now()
+    )
 )
 
 agent = sa.Table(
@@ -30,3 +34,35 @@ agent = sa.Table(
     sa.Column('uid', sa.INTEGER, primary_key=True),
     sa.Column('name', sa.TEXT)
 )
+
+export_watermark = sa.Table(
+    'export_watermarks',
+    metadata,
+    sa.Column('recipient', sa.TEXT, primary_key=True),
+    sa.Column('exported_at', sa.TIMESTAMP(timezone=True), nullable=False)
+)
+
+schema_version = sa.Table(
+    'schema_version',
+    metadata,
+    sa.Column('version', sa.INTEGER, primary_key=True),
+    sa.Column(
+        'applied_at', sa.TIMESTAMP(timezone=True),
+        server_default=sa.func.now()
+    )
+)
+
+# Indexes for hot queries, created by migrations.
+sa.Index(
+    'orders_inprogress_idx', order.c.uid,
+    postgresql_where=order.c.end_date == None  # noqa
+)
+sa.Index(
+    'orders_ended_idx', order.c.uid,
+    postgresql_where=order.c.end_date != None  # noqa
+)
+sa.Index('orders_agent_uid_idx', order.c.agent_uid)
+sa.Index('orders_start_date_idx', order.c.start_date)
+sa.Index('orders_end_date_idx', order.c.end_date)
+sa.Index('agents_name_lower_idx', sa.func.lower(agent.c.name))
+sa.Index('orders_updated_at_idx', order.c.updated_at)
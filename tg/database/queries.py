@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+#
+#  MoneyTracker: Database - Hot queries.
+#  Created by LulzLoL231 at 18/10/26
+#
+#  Plain SQL for the most frequent reads. asyncpg prepares each query once
+#  per pool connection (statement cache) and reuses it on every call, so
+#  there is no SQLAlchemy compile step and no re-parse on the server.
+#
+from datetime import date, datetime
+
+
+# Columns order for `Database._orders_from_records`.
+_ORDER_COLUMNS = '''o.uid, o.name, o.price, o.agent_uid,
+    o.start_date, o.end_date, a.name'''
+_ORDERS_FROM = 'orders o LEFT JOIN agents a ON a.uid = o.agent_uid'
+
+ORDERS_BY_UIDS = f'''SELECT {_ORDER_COLUMNS} FROM {_ORDERS_FROM}
+    WHERE o.uid = ANY($1::integer[])'''
+
+ORDERS = f'''SELECT {_ORDER_COLUMNS} FROM {_ORDERS_FROM}
+    ORDER BY o.uid'''
+
+ENDED_ORDERS_AFTER = f'''SELECT {_ORDER_COLUMNS} FROM {_ORDERS_FROM}
+    WHERE o.end_date IS NOT NULL AND o.uid > $1
+    ORDER BY o.uid LIMIT $2'''
+
+ENDED_ORDERS_BEFORE = f'''SELECT {_ORDER_COLUMNS} FROM {_ORDERS_FROM}
+    WHERE o.end_date IS NOT NULL AND o.uid < $1
+    ORDER BY o.uid DESC LIMIT $2'''
+
+INPROGRESS_ORDERS = f'''SELECT {_ORDER_COLUMNS} FROM {_ORDERS_FROM}
+    WHERE o.end_date IS NULL
+    ORDER BY o.uid'''
+
+INPROGRESS_ORDERS_AFTER = f'''SELECT {_ORDER_COLUMNS} FROM {_ORDERS_FROM}
+    WHERE o.end_date IS NULL AND o.uid > $1
+    ORDER BY o.uid LIMIT $2'''
+
+INPROGRESS_ORDERS_BEFORE = f'''SELECT {_ORDER_COLUMNS} FROM {_ORDERS_FROM}
+    WHERE o.end_date IS NULL AND o.uid < $1
+    ORDER BY o.uid DESC LIMIT $2'''
+
+AGENTS = 'SELECT uid, name FROM agents ORDER BY uid'
+
+
+def filtered_orders(
+    date_from: date | None = None, date_to: date | None = None,
+    agent_uid: int | None = None, paid: bool | None = None,
+    changed_after: datetime | None = None,
+    changed_before: datetime | None = None
+) -> tuple[str, list]:
+    '''Returns ORDERS query narrowed by export filter, with its arguments.
+
+    Only set conditions are added, so each variant uses own indexes.
+
+    Args:
+        date_from (date, optional): Min date, inclusive.
+        date_to (date, optional): Max date, inclusive.
+        agent_uid (int, optional): Agent UID.
+        paid (bool, optional): Paid or not paid orders only.
+        changed_after (datetime, optional): Min updated_at, exclusive.
+        changed_before (datetime, optional): Max updated_at, inclusive.
+
+    Returns:
+        tuple[str, list]: SQL query and arguments.
+    '''
+    conds: list[str] = []
+    args: list = []
+    if paid is True:
+        conds.append('o.end_date IS NOT NULL')
+    elif paid is False:
+        conds.append('o.end_date IS NULL')
+    date_column = 'o.end_date' if paid else 'o.start_date'
+    for value, cond in (
+        (date_from, f'{date_column} >= $'),
+        (date_to, f'{date_column} <= $'),
+        (agent_uid, 'o.agent_uid = $'),
+        (changed_after, 'o.updated_at > $'),
+        (changed_before, 'o.updated_at <= $')
+    ):
+        if value is not None:
+            args.append(value)
+            conds.append(f'{cond}{len(args)}')
+    where = f'WHERE {" AND ".join(conds)}' if conds else ''
+    return f'''SELECT {_ORDER_COLUMNS} FROM {_ORDERS_FROM}
+    {where}
+    ORDER BY o.uid''', args
+
+
+# Waits for running orders writes, see `Database.get_export_mark`.
+LOCK_ORDERS = 'LOCK TABLE orders IN SHARE MODE'
+CLOCK = 'SELECT clock_timestamp()'
+
+EXPORT_WATERMARK = '''SELECT exported_at FROM export_watermarks
+    WHERE recipient = $1'''
+
+SET_EXPORT_WATERMARK = '''INSERT INTO export_watermarks
+    (recipient, exported_at) VALUES ($1, $2)
+    ON CONFLICT (recipient) DO UPDATE SET exported_at = EXCLUDED.exported_at'''
+
+# Changes on any insert, update or delete of orders.
+EXPORT_VERSION = '''SELECT max(uid), count(*), max(updated_at) FROM orders'''
+
+# Columns order for `Database._stats_from_record`.
+_STATS_COLUMNS = '''count(*) FILTER (WHERE end_date IS NULL),
+    coalesce(sum(price) FILTER (WHERE end_date IS NULL), 0),
+    count(*) FILTER (WHERE end_date IS NOT NULL),
+    coalesce(sum(price) FILTER (WHERE end_date IS NOT NULL), 0)'''
+
+ORDERS_STATS = f'SELECT NULL, {_STATS_COLUMNS} FROM orders'
+
+AGENT_ORDERS_STATS = f'''SELECT $1::integer, {_STATS_COLUMNS} FROM orders
+    WHERE agent_uid = $1'''
+
+ORDERS_STATS_BY_AGENT = f'''SELECT agent_uid, {_STATS_COLUMNS} FROM orders
+    WHERE agent_uid IS NOT NULL
+    GROUP BY agent_uid'''
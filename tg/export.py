@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+#
+#  MoneyTracker - Orders export.
+#  Created by LulzLoL231 at 18/10/26
+#
+import io
+import os
+import pickle
+import asyncio
+from datetime import date, datetime, timedelta
+from tempfile import mkstemp
+from typing import AsyncIterator, BinaryIO, Hashable
+from concurrent.futures import ProcessPoolExecutor
+
+from openpyxl import Workbook
+from openpyxl.styles import Font
+from openpyxl.cell import WriteOnlyCell
+
+from config import cfg
+from database.schemas import ExportFilter, OrderRow
+from database.directory import AgentDirectory
+
+
+HEADER = (
+    '№ Заказа', 'Цель', 'Цена', 'Агент', 'Дата начала', 'Дата оплаты'
+)
+# Bounds exports in progress, including rows fetch.
+_limit = asyncio.Semaphore(cfg.export_limit)
+_executor: ProcessPoolExecutor | None = None
+# Keyboard presets: name and button text.
+EXPORT_PRESETS = {
+    'all': 'Весь период',
+    'month': 'Этот месяц',
+    'last_month': 'Прошлый месяц',
+    'unpaid': 'Не оплаченные',
+    'paid_month': 'Оплаченные за месяц',
+    'delta': 'С прошлого отчёта'
+}
+EXPORT_COMMAND_HELP = (
+    'export;с;по;агент;статус\n'
+    'Даты в формате ДД.ММ.ГГГГ, статус: paid или unpaid, '
+    'пустое поле - любое значение.\n'
+    'Например: export;01.09.2026;30.09.2026;;paid\n\n'
+    'Изменения с прошлого отчёта: export;delta'
+)
+# Last uploaded export by recipient: its version and file reference.
+_uploads: dict[Hashable, tuple[Hashable, str]] = {}
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(cfg.export_limit)
+    return _executor
+
+
+def shutdown_executor() -> None:
+    '''Stops export worker processes, called on bot shutdown.
+    '''
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
+
+
+class ExportFile(io.FileIO):
+    '''Temp export file, removed on close.
+
+    Open file can not be removed on Windows, so it is removed
+    after close.
+    '''
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            super().close()
+        finally:
+            os.unlink(self.name)
+
+
+def get_uploaded_export(
+    recipient: Hashable, version: Hashable
+) -> str | None:
+    '''Returns uploaded export, if it is the same export of same data.
+
+    Args:
+        recipient (Hashable): Chat ID.
+        version (Hashable): Export filter and data version, see
+            `Database.get_export_version`.
+
+    Returns:
+        str | None: File reference, like Tg file_id or VK doc attachment.
+    '''
+    upload = _uploads.get(recipient)
+    if upload and upload[0] == version:
+        return upload[1]
+    return None
+
+
+def set_uploaded_export(
+    recipient: Hashable, version: Hashable, file: str
+) -> None:
+    '''Saves uploaded export for reuse.
+
+    Args:
+        recipient (Hashable): Chat ID.
+        version (Hashable): Export filter and data version before
+            export was made.
+        file (str): File reference, like Tg file_id or VK doc attachment.
+    '''
+    _uploads[recipient] = (version, file)
+
+
+def get_export_preset(name: str, today: date | None = None) -> ExportFilter:
+    '''Returns export filter by preset name.
+
+    Args:
+        name (str): Preset name, key of `EXPORT_PRESETS`.
+        today (date, optional): Current date. Defaults is date.today().
+
+    Returns:
+        ExportFilter: Export filter, no filter for unknown preset.
+    '''
+    today = today or date.today()
+    month = today.replace(day=1)
+    if name == 'month':
+        return ExportFilter(date_from=month)
+    elif name == 'last_month':
+        last_month = (month - timedelta(days=1)).replace(day=1)
+        return ExportFilter(
+            date_from=last_month, date_to=month - timedelta(days=1)
+        )
+    elif name == 'unpaid':
+        return ExportFilter(paid=False)
+    elif name == 'paid_month':
+        return ExportFilter(date_from=month, paid=True)
+    elif name == 'delta':
+        return ExportFilter(delta=True)
+    return ExportFilter()
+
+
+def _parse_date(value: str) -> date | None:
+    for fmt in ('%d.%m.%Y', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_export_command(
+    text: str, agents: AgentDirectory
+) -> tuple[ExportFilter | None, list[str]]:
+    '''Parses "export;from;to;agent;status" or "export;delta" command.
+
+    Args:
+        text (str): Message text.
+        agents (AgentDirectory): Agents directory.
+
+    Returns:
+        tuple[ExportFilter | None, list[str]]: Filter and errors.
+    '''
+    fields = [i.strip() for i in text.split(';')[1:]]
+    if fields == ['delta']:
+        return ExportFilter(delta=True), []
+    if len(fields) > 4:
+        return None, ['Неверный синтаксис!']
+    fields += [''] * (4 - len(fields))
+    date_from, date_to, agent_name, status = fields
+    errors = []
+    params: dict = {}
+    for key, value in (('date_from', date_from), ('date_to', date_to)):
+        if value:
+            params[key] = _parse_date(value)
+            if params[key] is None:
+                errors.append(f'Неверная дата: {value}')
+    if agent_name:
+        agent = agents.find(agent_name)
+        if agent:
+            params['agent_uid'] = agent.uid
+        else:
+            errors.append(f'Агент {agent_name} не найден!')
+    if status.lower() == 'paid':
+        params['paid'] = True
+    elif status.lower() == 'unpaid':
+        params['paid'] = False
+    elif status:
+        errors.append(f'Неверный статус: {status}')
+    if errors:
+        return None, errors
+    return ExportFilter(**params), []
+
+
+def get_export_file_name(period: tuple[date, date]) -> str:
+    '''Returns export file name.
+
+    Args:
+        period (tuple[date, date]): Export period.
+
+    Returns:
+        str: File name.
+    '''
+    return f'Отчёт с {str(period[0])} по {str(period[1])}.xlsx'
+
+
+def render_export_file(
+    rows_path: str, path: str, flt: ExportFilter
+) -> tuple[date, date] | None:
+    '''Renders XLSX file from pickled rows chunks, runs in worker process.
+
+    Rows are written by write-only worksheet, so memory use does not
+    grow with rows count.
+
+    Args:
+        rows_path (str): File with pickled lists of row tuples.
+        path (str): XLSX file path.
+        flt (ExportFilter): Filter used for rows.
+
+    Returns:
+        tuple[date, date] | None: Filter dates range, completed by rows
+            dates, None if there is no orders.
+    '''
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet()
+    header = []
+    for title in HEADER:
+        cell = WriteOnlyCell(ws, title)
+        cell.font = Font(bold=True)
+        header.append(cell)
+    ws.append(header)
+    # Index of filtered date in row tuple.
+    date_idx = 5 if flt.paid else 4
+    first = last = None
+    with open(rows_path, 'rb') as rows_file:
+        while True:
+            try:
+                rows = pickle.load(rows_file)
+            except EOFError:
+                break
+            for uid, name, price, agent_name, start_date, end_date in rows:
+                ws.append((
+                    uid,
+                    name,
+                    price if price else 'Н/д',
+                    agent_name,
+                    str(start_date),
+                    str(end_date) if end_date else 'Не оплачен'
+                ))
+            for row in rows:
+                if first is None or row[date_idx] < first:
+                    first = row[date_idx]
+                if last is None or row[date_idx] > last:
+                    last = row[date_idx]
+    if first is None:
+        period = None
+    elif flt.changed_before:
+        # Delta export period is changes range.
+        period = (
+            flt.changed_after.date() if flt.changed_after else first,
+            flt.changed_before.date()
+        )
+    else:
+        period = (flt.date_from or first, flt.date_to or last)
+    if period:
+        ws.title = f'с {str(period[0])} по {str(period[1])}'
+    wb.save(path)
+    return period
+
+
+async def make_export_file(
+    chunks: AsyncIterator[list[OrderRow]], flt: ExportFilter | None = None
+) -> tuple[BinaryIO, tuple[date, date] | None]:
+    '''Makes XLSX file from streamed orders and return it.
+
+    Orders are spooled to temp file as plain tuples and rendered by
+    worker process, so event loop is not blocked.
+
+    Args:
+        chunks (AsyncIterator[list[OrderRow]]): Orders by chunks,
+            like `Database.iterate_orders`.
+        flt (ExportFilter, optional): Filter used for orders.
+            Defaults is None.
+
+    Returns:
+        tuple[BinaryIO, tuple[date, date] | None]: XLSX file and its
+            period, None if there is no orders.
+    '''
+    async with _limit:
+        fd, rows_path = mkstemp(suffix='.pickle')
+        fd_out, path = mkstemp(suffix='.xlsx')
+        os.close(fd_out)
+        try:
+            with os.fdopen(fd, 'wb') as rows_file:
+                async for orders in chunks:
+                    pickle.dump([(
+                        o.uid, o.name, o.price, o.agent.name,
+                        o.start_date, o.end_date
+                    ) for o in orders], rows_file)
+            period = await asyncio.get_running_loop().run_in_executor(
+                _get_executor(), render_export_file, rows_path, path,
+                flt or ExportFilter()
+            )
+            return ExportFile(path), period
+        except BaseException:
+            os.unlink(path)
+            raise
+        finally:
+            os.unlink(rows_path)
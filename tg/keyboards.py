@@ -5,10 +5,35 @@
 #
 from aiogram import types
 
-from database.schemas import Agent, Order
+from callbacks import pack
+from database.schemas import Agent, Order, OrderRow, Page
 
 
 class Keyboards:
+    @staticmethod
+    def _add_pages(
+        key: types.InlineKeyboardMarkup, page: Page, action: str
+    ) -> None:
+        '''Adds prev & next btns row to keyboard.
+
+        Args:
+            key (types.InlineKeyboardMarkup): Tg inline keyboard.
+            page (Page): Page of items with "uid".
+            action (str): Callback action with "after" & "before" args,
+                like "orders".
+        '''
+        btns = []
+        if page.has_prev:
+            btns.append(types.InlineKeyboardButton(
+                '«', callback_data=pack(action, None, page.items[0].uid)
+            ))
+        if page.has_next:
+            btns.append(types.InlineKeyboardButton(
+                '»', callback_data=pack(action, page.items[-1].uid)
+            ))
+        if btns:
+            key.row(*btns)
+
     @staticmethod
     def start() -> types.InlineKeyboardMarkup:
         '''Returns start keyboard.
@@ -76,23 +101,24 @@ class Keyboards:
 
     @staticmethod
     def del_agent(
-        agents: list[Agent]
+        agents: Page[Agent]
     ) -> types.InlineKeyboardMarkup:
         '''Inline keyboard with keys for delete agent.
 
         Args:
-            agents (list[Agent]): Array of agents.
+            agents (Page[Agent]): Page of agents.
 
         Returns:
             types.InlineKeyboardMarkup: Tg inline keyboard.
         '''
         key = types.InlineKeyboardMarkup(2)
-        for agent in agents:
+        for agent in agents.items:
             key.insert(types.InlineKeyboardButton(
                 agent.name,
-                callback_data=f'del_agent#{agent.uid}'
+                callback_data=pack('del_agent', agent.uid)
             ))
         key.row()
+        Keyboards._add_pages(key, agents, 'del_agents')
         key.add(types.InlineKeyboardButton(
             'Назад',
             callback_data='agents'
@@ -101,29 +127,35 @@ class Keyboards:
 
     @staticmethod
     def orders(
-        orders: list[Order],
+        orders: Page[OrderRow],
         with_his: bool = True
     ) -> types.InlineKeyboardMarkup:
         '''Returns orders short names keyboard.
 
         Args:
-            orders (list[Order]): Array of orders.
+            orders (Page[OrderRow]): Page of orders.
             with_his (bool, optional): Add histofy btn? Defaults to True.
 
         Returns:
             types.InlineKeyboardMarkup: Tg inline keyboard.
         '''
         key = types.InlineKeyboardMarkup(2)
-        for ord in orders:
+        for ord in orders.items:
             key.insert(types.InlineKeyboardButton(
                 f'Заказ #{ord.uid}',
-                callback_data=f'order#{ord.uid}'
+                callback_data=pack('order', ord.uid)
             ))
         key.row()
+        Keyboards._add_pages(key, orders, 'orders')
         key.insert(types.InlineKeyboardButton(
             'Добавить',
             callback_data='add_order'
         ))
+        if orders.items:
+            key.insert(types.InlineKeyboardButton(
+                'Выбрать',
+                callback_data='select_orders'
+            ))
         if with_his:
             key.insert(types.InlineKeyboardButton(
                 'История',
@@ -136,6 +168,46 @@ class Keyboards:
         ))
         return key
 
+    @staticmethod
+    def orders_select(
+        orders: Page[OrderRow],
+        selected: list[int]
+    ) -> types.InlineKeyboardMarkup:
+        '''Returns orders multi-select keyboard.
+
+        Args:
+            orders (Page[OrderRow]): Page of orders.
+            selected (list[int]): Selected orders UIDs.
+
+        Returns:
+            types.InlineKeyboardMarkup: Tg inline keyboard.
+        '''
+        key = types.InlineKeyboardMarkup(2)
+        for ord in orders.items:
+            mark = '✅ ' if ord.uid in selected else ''
+            key.insert(types.InlineKeyboardButton(
+                f'{mark}Заказ #{ord.uid}',
+                callback_data=pack('sel_order', ord.uid)
+            ))
+        key.row()
+        Keyboards._add_pages(key, orders, 'select_orders')
+        if selected:
+            key.row(
+                types.InlineKeyboardButton(
+                    'Оплачены',
+                    callback_data='sel_orders_end'
+                ),
+                types.InlineKeyboardButton(
+                    'Удалить',
+                    callback_data='sel_orders_del'
+                )
+            )
+        key.add(types.InlineKeyboardButton(
+            'Отмена',
+            callback_data='orders'
+        ))
+        return key
+
     @staticmethod
     def order_ctrl(order: Order) -> types.InlineKeyboardMarkup:
         '''Returns order control keyboard.
@@ -149,16 +221,16 @@ class Keyboards:
         key = types.InlineKeyboardMarkup(2)
         key.insert(types.InlineKeyboardButton(
             'Оплачен',
-            callback_data=f'end_order#{order.uid}'
+            callback_data=pack('end_order', order.uid)
         ))
         key.insert(types.InlineKeyboardButton(
             'Удалить',
-            callback_data=f'del_order#{order.uid}'
+            callback_data=pack('del_order', order.uid)
         ))
         if not order.price:
             key.row(types.InlineKeyboardButton(
                 'Установить цену',
-                callback_data=f'set_price_order#{order.uid}'
+                callback_data=pack('set_price_order', order.uid)
             ))
         key.add(types.InlineKeyboardButton(
             'Назад',
@@ -167,13 +239,19 @@ class Keyboards:
         return key
 
     @staticmethod
-    def order_history() -> types.InlineKeyboardButton:
+    def order_history(
+        orders: Page[OrderRow]
+    ) -> types.InlineKeyboardMarkup:
         '''returns orders history keyboard.
 
+        Args:
+            orders (Page[OrderRow]): Page of paid orders.
+
         Returns:
-            types.InlineKeyboardButton: Tg inline keyboard.
+            types.InlineKeyboardMarkup: Tg inline keyboard.
         '''
         key = types.InlineKeyboardMarkup()
+        Keyboards._add_pages(key, orders, 'ordres_history')
         key.add(types.InlineKeyboardButton(
             'Информация о заказе',
             callback_data='info_order'
@@ -189,21 +267,45 @@ class Keyboards:
         return key
 
     @staticmethod
-    def add_order_agents(agents: list[Agent]) -> types.InlineKeyboardMarkup:
+    def export_presets(
+        presets: dict[str, str]
+    ) -> types.InlineKeyboardMarkup:
+        '''Returns export presets keyboard.
+
+        Args:
+            presets (dict[str, str]): Preset names and btns text.
+
+        Returns:
+            types.InlineKeyboardMarkup: Tg inline keyboard.
+        '''
+        key = types.InlineKeyboardMarkup(2)
+        for name, text in presets.items():
+            key.insert(types.InlineKeyboardButton(
+                text, callback_data=pack('export', name)
+            ))
+        key.add(types.InlineKeyboardButton(
+            'Назад',
+            callback_data='ordres_history'
+        ))
+        return key
+
+    @staticmethod
+    def add_order_agents(agents: Page[Agent]) -> types.InlineKeyboardMarkup:
         '''Returns keyboard with agents.
 
         Args:
-            agents (list[Agent]): Array of agents.
+            agents (Page[Agent]): Page of agents.
 
         Returns:
             types.InlineKeyboardMarkup: Tg inline keyboard.
         '''
         key = types.InlineKeyboardMarkup(2)
-        for agent in agents:
+        for agent in agents.items:
             key.insert(types.InlineKeyboardButton(
-                agent.name, callback_data=f'agent_order#{agent.uid}'
+                agent.name, callback_data=pack('agent_order', agent.uid)
             ))
         key.row()
+        Keyboards._add_pages(key, agents, 'add_order_agents')
         key.add(types.InlineKeyboardButton(
             'Отмена', callback_data='orders'
         ))
@@ -238,7 +340,7 @@ class Keyboards:
         key = types.InlineKeyboardMarkup(2)
         key.insert(types.InlineKeyboardButton(
             f'Заказ #{uid}',
-            callback_data=f'order#{uid}'
+            callback_data=pack('order', uid)
         ))
         key.row()
         key.add(types.InlineKeyboardButton(
@@ -3,19 +3,39 @@
 #  MoneyTracker
 #  Created by LulzLoL231 at 20/10/22
 #
+import hmac
+import asyncio
 import logging
+import contextvars
+from urllib.parse import urlsplit
 
-from aiogram import Bot, Dispatcher, executor
+from aiohttp import web
+from aiogram import Bot, Dispatcher, executor, types
+from aiogram.bot.api import TELEGRAM_PRODUCTION, TelegramAPIServer
 from aiogram.types import BotCommand, BotCommandScopeAllPrivateChats
 from aiogram.contrib.fsm_storage.memory import MemoryStorage
 
 from config import cfg
 from database.main import db
+from export import shutdown_executor
+from callbacks import CallbackRouter
 
 
 log = logging.getLogger('MoneyTracker')
-bot = Dispatcher(Bot(cfg.token, parse_mode='HTML'), storage=MemoryStorage())
+SECRET_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+# Seconds to process queued updates on shutdown.
+SHUTDOWN_TIMEOUT = 30
+if cfg.api_server:
+    api_server = TelegramAPIServer.from_base(cfg.api_server)
+else:
+    api_server = TELEGRAM_PRODUCTION
+bot = Dispatcher(
+    Bot(cfg.token, parse_mode='HTML', server=api_server),
+    storage=MemoryStorage()
+)
 exec = executor.Executor(bot)
+callbacks = CallbackRouter()
+bot.register_callback_query_handler(callbacks.dispatch, state='*')
 privateChatCmds = [
     BotCommand('/start', 'Запустить бота'),
     BotCommand('/add_order', 'Добавить новый заказ'),
@@ -25,8 +45,8 @@ privateChatCmds = [
 
 async def startup_task(dp: Dispatcher):
     log.info(f'Loading v{cfg.VERSION}...')
-    db._create_tables()
     await db.connect()
+    await db.migrate()
     await dp.bot.set_my_commands(
         privateChatCmds, BotCommandScopeAllPrivateChats()
     )
@@ -34,8 +54,116 @@ async def startup_task(dp: Dispatcher):
 
 async def shutdown_task(_):
     log.info('Shutting down...')
+    shutdown_executor()
     await db.disconnect()
 
 
 exec.on_startup(startup_task)
 exec.on_shutdown(shutdown_task)
+
+
+class Webhook:
+    '''Webhook server, updates are acknowledged at once and processed
+    by workers pool.
+
+    Args:
+        dp (Dispatcher): Bot dispatcher.
+        url (str): Public webhook URL, its path is served.
+        secret (str): Secret token, sent by Telegram in every request.
+        workers (int): Updates processing workers count.
+        queue_size (int): Max not processed updates count.
+    '''
+    def __init__(
+        self, dp: Dispatcher, url: str, secret: str,
+        workers: int, queue_size: int
+    ) -> None:
+        self.dp = dp
+        self.url = url
+        self.secret = secret
+        self.workers = workers
+        self.queue: asyncio.Queue[types.Update] = asyncio.Queue(queue_size)
+        self._tasks: list[asyncio.Task] = []
+
+    def get_app(self) -> web.Application:
+        '''Returns aiohttp app with webhook route and startup tasks.
+        '''
+        app = web.Application()
+        app.router.add_post(urlsplit(self.url).path or '/', self.handle)
+        app.on_startup.append(self.on_startup)
+        app.on_shutdown.append(self.on_shutdown)
+        return app
+
+    async def handle(self, request: web.Request) -> web.Response:
+        '''Validates and enqueues update.
+        '''
+        if not hmac.compare_digest(
+            request.headers.get(SECRET_HEADER, '').encode(),
+            self.secret.encode()
+        ):
+            log.warning(f'Wrong webhook secret from {request.remote}')
+            return web.Response(status=401)
+        try:
+            update = types.Update(**await request.json())
+        except (ValueError, TypeError):
+            return web.Response(status=400)
+        try:
+            self.queue.put_nowait(update)
+        except asyncio.QueueFull:
+            # Telegram will retry it later.
+            log.warning('Webhook queue is full!')
+            return web.Response(status=503)
+        return web.Response()
+
+    async def _work(self) -> None:
+        Bot.set_current(self.dp.bot)
+        Dispatcher.set_current(self.dp)
+        while True:
+            update = await self.queue.get()
+            try:
+                # Own task has own context, current update objects
+                # are not left to the next one.
+                await asyncio.ensure_future(self.dp.process_update(update))
+            except Exception:
+                log.exception(f'Update {update.update_id} processing failed!')
+            finally:
+                self.queue.task_done()
+
+    async def on_startup(self, _) -> None:
+        await startup_task(self.dp)
+        # Startup binds DB connection to this context, workers and
+        # their updates must not share it, so they get an empty one.
+        self._tasks = [
+            contextvars.Context().run(asyncio.ensure_future, self._work())
+            for _ in range(self.workers)
+        ]
+        await self.dp.bot.set_webhook(self.url, secret_token=self.secret)
+        log.info(f'Webhook is set to {self.url}')
+
+    async def on_shutdown(self, _) -> None:
+        # Webhook is kept, other instances may serve it.
+        try:
+            await asyncio.wait_for(self.queue.join(), SHUTDOWN_TIMEOUT)
+        except asyncio.TimeoutError:
+            log.warning(f'{self.queue.qsize()} updates are not processed!')
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await shutdown_task(self.dp)
+        await self.dp.storage.close()
+        await self.dp.storage.wait_closed()
+        await (await self.dp.bot.get_session()).close()
+
+
+def run() -> None:
+    '''Runs bot by webhook if its URL is set, by long polling otherwise.
+    '''
+    if cfg.webhook_url:
+        webhook = Webhook(
+            bot, cfg.webhook_url, cfg.webhook_secret,  # type: ignore
+            cfg.webhook_workers, cfg.webhook_queue_size
+        )
+        web.run_app(
+            webhook.get_app(), host=cfg.webhook_host, port=cfg.webhook_port
+        )
+    else:
+        exec.start_polling()
@@ -4,8 +4,8 @@
 #  Created by LulzLoL231 at 20/10/22
 #
 import cmds
-from runtimes import exec
+from runtimes import run
 
 
 if __name__ == '__main__':
-    exec.start_polling()
+    run()
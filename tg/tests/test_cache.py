@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+#
+#  MoneyTracker - Database cache tests.
+#  Created by LulzLoL231 at 18/10/26
+#
+from database.cache import TTLCache
+
+
+def test_lru_eviction():
+    cache: TTLCache[int, str] = TTLCache(2, 60)
+    cache.set(1, 'a')
+    cache.set(2, 'b')
+    cache.get(1)
+    cache.set(3, 'c')
+    assert cache.get(1) == 'a'
+    assert cache.get(2) is None
+
+
+def test_fill_after_change_is_skipped():
+    cache: TTLCache[int, str] = TTLCache(10, 60)
+    version = cache.version
+    # Write-through while load is running.
+    cache.set(1, 'new')
+    cache.set(1, 'stale', version)
+    assert cache.get(1) == 'new'
+
+
+def test_fill_after_eviction_is_skipped():
+    cache: TTLCache[int, str] = TTLCache(10, 60)
+    version = cache.version
+    cache.pop(1)
+    cache.set(1, 'stale', version)
+    assert cache.get(1) is None
+    version = cache.version
+    cache.clear()
+    cache.set(1, 'stale', version)
+    assert cache.get(1) is None
+
+
+def test_fill_without_changes():
+    cache: TTLCache[int, str] = TTLCache(10, 60)
+    version = cache.version
+    cache.set(1, 'a', version)
+    cache.set(2, 'b', version)
+    assert cache.get(1) == 'a' and cache.get(2) == 'b'
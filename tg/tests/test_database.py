@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+#
+#  MoneyTracker - Database tests.
+#  Created by LulzLoL231 at 18/10/26
+#
+import asyncio
+
+import pytest
+from asyncpg import PostgresError
+
+from utils import gather
+from database.main import db
+
+
+def _run(test):
+    async def main():
+        try:
+            await db.connect()
+        except (OSError, PostgresError):
+            pytest.skip('PostgreSQL is not available.')
+        try:
+            await db.migrate()
+            await test()
+        finally:
+            await db.disconnect()
+    asyncio.run(main())
+
+
+def test_write_then_gathered_reads():
+    # Write binds connection to handler context, so gathered reads
+    # below share it and must not run on it at once.
+    async def test():
+        agent = await db.add_agent('Test agent')
+        order = await db.add_order('Test order', agent.uid, 10)
+        try:
+            stats, page = await gather(
+                db.get_orders_stats(), db.get_inprogress_orders_page()
+            )
+            assert stats.inprogress_count >= 1
+            assert page.items
+        finally:
+            await db.del_order(order.uid)
+            await db.del_agent(agent.uid)
+    _run(test)
+
+
+def test_rolled_back_write_keeps_caches():
+    async def test():
+        agent = await db.add_agent('Test agent')
+        order = await db.add_order('Test order', agent.uid, 10)
+        notify = db._notify
+
+        async def fail(*args):
+            raise RuntimeError('fail')
+        db._notify = fail  # type: ignore
+        try:
+            with pytest.raises(RuntimeError):
+                await db.del_order(order.uid)
+        finally:
+            db._notify = notify  # type: ignore
+        try:
+            assert db.orders_cache.get(order.uid) == order
+            assert await db.get_order_by_uid(order.uid) == order
+        finally:
+            await db.del_order(order.uid)
+            await db.del_agent(agent.uid)
+    _run(test)
+
+
+def test_ended_orders_pages():
+    async def test():
+        agent = await db.add_agent('Test agent')
+        orders = await db.add_orders([
+            {'name': f'Test order {i}', 'agent_uid': agent.uid, 'price': i}
+            for i in range(5)
+        ])
+        uids = [o.uid for o in orders]
+        await db.end_orders(uids)
+        try:
+            last = await db.get_ended_orders_page(uids[0] - 1, limit=2)
+            assert [o.uid for o in last.items] == uids[:2]
+            assert last.has_prev and last.has_next
+            page = await db.get_ended_orders_page(uids[1], limit=2)
+            assert [o.uid for o in page.items] == uids[2:4]
+            page = await db.get_ended_orders_page(before=uids[2], limit=2)
+            assert [o.uid for o in page.items] == uids[:2]
+        finally:
+            await db.del_orders(uids)
+            await db.del_agent(agent.uid)
+    _run(test)
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+#
+#  MoneyTracker - Export tests.
+#  Created by LulzLoL231 at 18/10/26
+#
+import os
+import asyncio
+from datetime import date
+from types import SimpleNamespace
+
+import export
+
+
+async def _chunks():
+    yield [SimpleNamespace(
+        uid=1, name='Test order', price=10,
+        agent=SimpleNamespace(name='Test agent'),
+        start_date=date(2026, 10, 1), end_date=None
+    )]
+
+
+def test_export_file_is_removed_on_close():
+    async def main():
+        try:
+            return await export.make_export_file(_chunks())
+        finally:
+            export.shutdown_executor()
+
+    file, period = asyncio.run(main())
+    assert period == (date(2026, 10, 1), date(2026, 10, 1))
+    with file:
+        assert file.read(2) == b'PK'
+        assert os.path.exists(file.name)
+    assert not os.path.exists(file.name)
+    assert export._executor is None
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+#
+#  MoneyTracker - Utils tests.
+#  Created by LulzLoL231 at 18/10/26
+#
+import asyncio
+
+import pytest
+
+from utils import gather
+
+
+async def _value(value, delay=0):
+    await asyncio.sleep(delay)
+    return value
+
+
+async def _fail():
+    raise RuntimeError('fail')
+
+
+def test_gather_empty():
+    assert asyncio.run(gather()) == []
+
+
+def test_gather_order():
+    assert asyncio.run(gather(_value(1, 0.01), _value(2))) == [1, 2]
+
+
+def test_gather_cancels_on_error():
+    slow = asyncio.Event()
+
+    async def _slow():
+        try:
+            await asyncio.sleep(10)
+        finally:
+            slow.set()
+
+    async def main():
+        with pytest.raises(RuntimeError):
+            await gather(_slow(), _fail())
+        assert slow.is_set()
+
+    asyncio.run(main())
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+#
+#  MoneyTracker - Webhook tests.
+#  Created by LulzLoL231 at 18/10/26
+#
+import os
+import asyncio
+from urllib.parse import urlsplit
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+from aiogram import Bot, Dispatcher, types
+from aiogram.contrib.fsm_storage.memory import MemoryStorage
+
+import runtimes
+from config import cfg
+from runtimes import SECRET_HEADER, Webhook
+
+
+URL = 'https://example.com/tg/hook'
+SECRET = 's3cret'
+
+
+class FakeBotAPI:
+    '''Bot API server on BOT_APISERVER address, records called methods.
+
+    answerCallbackQuery waits for `release`, so updates can be kept
+    in processing.
+    '''
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, dict]] = []
+        self.answering = asyncio.Event()
+        self.release = asyncio.Event()
+        app = web.Application()
+        app.router.add_post('/bot{token}/{method}', self.handle)
+        address = urlsplit(os.environ['BOT_APISERVER'])
+        self.server = TestServer(
+            app, host=address.hostname, port=address.port
+        )
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info['method']
+        self.calls.append((method, dict(await request.post())))
+        if method == 'answerCallbackQuery':
+            self.answering.set()
+            await self.release.wait()
+        return web.json_response({'ok': True, 'result': True})
+
+    def called(self, method: str) -> list[dict]:
+        return [data for name, data in self.calls if name == method]
+
+
+def _update(update_id: int) -> dict:
+    return {
+        'update_id': update_id,
+        'callback_query': {
+            'id': str(update_id), 'chat_instance': '1', 'data': 'test',
+            'from': {'id': 1, 'is_bot': False, 'first_name': 'Test'},
+            'message': {
+                'message_id': 1, 'date': 0,
+                'chat': {'id': 1, 'type': 'private'}
+            }
+        }
+    }
+
+
+@pytest.fixture
+def no_db(monkeypatch):
+    # Startup & shutdown of webhook are tested without DB.
+    async def task(_):
+        pass
+    monkeypatch.setattr(runtimes, 'startup_task', task)
+    monkeypatch.setattr(runtimes, 'shutdown_task', task)
+
+
+def test_webhook(no_db):
+    async def main():
+        api = FakeBotAPI()
+        dp = Dispatcher(
+            Bot(cfg.token, server=runtimes.api_server),
+            storage=MemoryStorage()
+        )
+
+        async def answer(query: types.CallbackQuery):
+            await query.answer()
+        dp.register_callback_query_handler(answer)
+        webhook = Webhook(dp, URL, SECRET, workers=1, queue_size=1)
+        headers = {SECRET_HEADER: SECRET}
+        async with api.server, \
+                TestClient(TestServer(webhook.get_app())) as client:
+            assert api.called('setWebhook') == [
+                {'url': URL, 'secret_token': SECRET}
+            ]
+            resp = await client.post('/tg/hook', json=_update(1))
+            assert resp.status == 401
+            resp = await client.post(
+                '/tg/hook', data='{bad', headers=headers
+            )
+            assert resp.status == 400
+            # First update is processed, second one fills queue.
+            resp = await client.post(
+                '/tg/hook', json=_update(2), headers=headers
+            )
+            assert resp.status == 200
+            await asyncio.wait_for(api.answering.wait(), 5)
+            resp = await client.post(
+                '/tg/hook', json=_update(3), headers=headers
+            )
+            assert resp.status == 200
+            resp = await client.post(
+                '/tg/hook', json=_update(4), headers=headers
+            )
+            assert resp.status == 503
+            api.release.set()
+            await asyncio.wait_for(webhook.queue.join(), 5)
+        assert [
+            i['callback_query_id'] for i in api.called('answerCallbackQuery')
+        ] == ['2', '3']
+    asyncio.run(main())
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+#
+#  MoneyTracker - Utils.
+#  Created by LulzLoL231 at 18/10/26
+#
+import asyncio
+from typing import Any, Awaitable
+
+
+async def gather(*aws: Awaitable) -> list[Any]:
+    '''Runs awaitables concurrently and returns their results in order.
+
+    Unlike `asyncio.gather`, on first error others are cancelled
+    and awaited before the error is raised, so nothing of failed
+    handler keeps running. Cancellation of caller cancels them too.
+
+    Args:
+        *aws (Awaitable): Coroutines or futures.
+
+    Raises:
+        Exception: First error of awaitables.
+
+    Returns:
+        list[Any]: Results.
+    '''
+    if not aws:
+        # asyncio.wait does not accept empty set.
+        return []
+    tasks = [asyncio.ensure_future(i) for i in aws]
+    try:
+        _, pending = await asyncio.wait(
+            tasks, return_when=asyncio.FIRST_EXCEPTION
+        )
+    except asyncio.CancelledError:
+        for task in tasks:
+            task.cancel()
+        raise
+    if pending:
+        for task in pending:
+            task.cancel()
+        await asyncio.wait(pending)
+    # Also marks all errors as retrieved.
+    errors = [
+        task.exception() for task in tasks
+        if not task.cancelled() and task.exception()
+    ]
+    if errors:
+        raise errors[0]  # type: ignore
+    return [task.result() for task in tasks]
@@ -3,7 +3,6 @@
 #  MoneyTracker: cmds - Agents
 #  Created by LulzLoL231 at 28/06/22
 #
-import json
 import logging
 
 from vkbottle.bot import Message
@@ -12,6 +11,9 @@ from vkbottle.dispatch.rules.base import FuncRule, StateRule
 
 from database.main import db as Database
 from keyboards import Keyboards as keys
+from profiles import profiles
+from commands import router as commands
+from utils import gather
 
 
 log = logging.getLogger('MoneyTracker')
@@ -22,32 +24,34 @@ class AddAgent(BaseStateGroup):
     NAME = 'name'
 
 
-def is_del_agent_cmd(payload: str | None) -> bool:
-    if payload:
-        pd = json.loads(payload)
-        return pd.get('command', '').startswith('del_agent#')
-    return False
-
-
 @bp.on.private_message(FuncRule(
     lambda m: m.text.lower() in ['/agents', 'агенты']
 ))
-@bp.on.private_message(payload={'command': 'agents'})
+@commands('agents')
 async def agents(msg: Message):
-    user = await msg.get_user()
+    user, agents, stats = await gather(
+        profiles.get(msg.from_id), Database.get_agents(),
+        Database.get_orders_stats_by_agent()
+    )
     log.info(f'Called by {user.first_name} {user.last_name} ({user.id})')
-    agents = await Database.get_agents()
     if agents:
         cnt = 'Список агентов:\n\n'
-        cnt += '\n'.join([f'#{a.uid} - {a.name}' for a in agents])
+        for a in agents:
+            cnt += f'#{a.uid} - {a.name}'
+            if a.uid in stats and stats[a.uid].inprogress_count:
+                cnt += (
+                    f' (в работе: {stats[a.uid].inprogress_count}, '
+                    f'{stats[a.uid].inprogress_sum} руб.)'
+                )
+            cnt += '\n'
     else:
         cnt = 'Агенты отсутствуют. Добавьте нового!'
     await msg.answer(cnt, keyboard=keys.agents(bool(agents)))
 
 
-@bp.on.private_message(payload={'command': 'add_agent'})
+@commands('add_agent')
 async def add_agent_start(msg: Message):
-    user = await msg.get_user()
+    user = await profiles.get(msg.from_id)
     log.info(f'Called by {user.first_name} {user.last_name} ({user.id})')
     await bp.state_dispenser.set(msg.peer_id, AddAgent.NAME)
     await msg.answer('Добавление нового агента.\n\nОтправьте имя агента.')
@@ -55,7 +59,7 @@ async def add_agent_start(msg: Message):
 
 @bp.on.private_message(StateRule(AddAgent.NAME))
 async def add_agent_end(msg: Message):
-    user = await msg.get_user()
+    user = await profiles.get(msg.from_id)
     log.info(f'Called by {user.first_name} {user.last_name} ({user.id})')
     if msg.text.lower() == 'назад':
         await bp.state_dispenser.delete(msg.peer_id)
@@ -63,7 +67,6 @@ async def add_agent_end(msg: Message):
         await agents(msg)
         return
     agent = await Database.add_agent(msg.text)
-    Database.get_agent_by_uid.cache_clear()
     await bp.state_dispenser.delete(msg.peer_id)
     await msg.answer(
         f'Агент #{agent.uid} - Добавлен!',
@@ -71,12 +74,15 @@ async def add_agent_end(msg: Message):
     )
 
 
-@bp.on.private_message(payload={'command': 'del_agent'})
-async def del_agent_start(msg: Message):
-    user = await msg.get_user()
+@commands('del_agents', after=int, before=int)
+async def del_agent_start(
+    msg: Message, after: int | None = None, before: int | None = None
+):
+    user, agents = await gather(
+        profiles.get(msg.from_id), Database.get_agents_page(after or 0, before)
+    )
     log.info(f'Called by {user.first_name} {user.last_name} ({user.id})')
-    agents = await Database.get_agents()
-    if not agents:
+    if not agents.items:
         await msg.answer(
             'Агенты отсутствуют. Нечего удалять.',
             keyboard=keys.back('agents')
@@ -88,15 +94,12 @@ async def del_agent_start(msg: Message):
         )
 
 
-@bp.on.private_message(FuncRule(lambda m: is_del_agent_cmd(m.payload)))
-async def del_agent_end(msg: Message):
-    user = await msg.get_user()
+@commands('del_agent', uid=int)
+async def del_agent_end(msg: Message, uid: int):
+    user = await profiles.get(msg.from_id)
     log.info(f'Called by {user.first_name} {user.last_name} ({user.id})')
-    msg_payload_json: dict = msg.get_payload_json()  # type: ignore
-    agent_uid = int(msg_payload_json['command'].split('#')[1])
-    await Database.del_agent(agent_uid)
-    Database.get_agent_by_uid.cache_clear()
+    await Database.del_agent(uid)
     await msg.answer(
-        f'Агент #{agent_uid} - удален!',
+        f'Агент #{uid} - удален!',
         keyboard=keys.back('agents')
     )
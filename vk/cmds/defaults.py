@@ -10,6 +10,9 @@ from vkbottle.dispatch.rules.base import FuncRule
 
 from config import cfg
 from keyboards import Keyboards as keys
+from profiles import profiles
+from commands import router as commands
+from utils import gather
 from database.main import db as Database
 
 
@@ -18,27 +21,24 @@ bp = BotBlueprint('defaults')
 
 
 @bp.on.message(FuncRule(lambda m: m.text.lower() in ['/start', 'начать']))
-@bp.on.message(payload={'command': 'start'})
+@commands('start', private=False)
 async def start_bot(msg: Message):
-    user = await msg.get_user()
+    user, dashboard = await gather(
+        profiles.get(msg.from_id), Database.get_dashboard()
+    )
     log.info(f'Called by {user.first_name} {user.last_name} ({user.id})')
-    orders = await Database.get_inprogress_orders()
     cnt = f'Привет {user.first_name}!\n\n'
-    if orders:
-        cnt += 'Текущие заказы:\n'
-        full_price = 0
-        for ord in orders:
-            cnt += f'{ord.get_short_str()}\n'
-            full_price += ord.price
-        cnt += f'\nИтого: {full_price} руб.'
+    if dashboard:
+        cnt += f'Текущие заказы:\n{dashboard.text}\n'
+        cnt += f'\nИтого: {dashboard.total} руб.'
     else:
         cnt += 'Все заказы выполнены.'
     await msg.answer(cnt, keyboard=keys.start())
 
 
-@bp.on.message(payload={'command': 'about'})
+@commands('about', private=False)
 async def about_bot(msg: Message):
-    user = await msg.get_user()
+    user = await profiles.get(msg.from_id)
     log.info(f'Called by {user.first_name} {user.last_name} ({user.id})')
     cnt = f'MoneyTracker\nОтслеживаем оплату заказов.\n\n' \
           f'Создатель: @0x403\nВерсия: {cfg.VERSION}'
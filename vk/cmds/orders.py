@@ -3,21 +3,26 @@
 #  MoneyTracker: cmds - Orders
 #  Created by LulzLoL231 at 28/06/22
 #
-import json
 import logging
-from io import BytesIO
 from dataclasses import dataclass
 
-from openpyxl import Workbook
-from openpyxl.styles import Font
 from vkbottle.bot import Message
 from vkbottle.tools import DocMessagesUploader
 from vkbottle import BaseStateGroup, BotBlueprint
 from vkbottle.dispatch.rules.base import FuncRule, StateRule
 
-from database.schemas import Order
+from database.schemas import ExportFilter
 from keyboards import Keyboards as keys
+from profiles import profiles
+from commands import Command, router as commands
+from utils import gather
+from export import (
+    EXPORT_COMMAND_HELP, EXPORT_PRESETS, get_export_file_name,
+    get_export_preset, get_uploaded_export, make_export_file,
+    parse_export_command, set_uploaded_export
+)
 from database.main import db as Database
+from database.directory import AgentDirectory
 
 
 log = logging.getLogger('MoneyTracker')
@@ -39,6 +44,10 @@ class OrderPrice(BaseStateGroup):
     PRICE = 'order_price'
 
 
+class SelectOrders(BaseStateGroup):
+    UIDS = 'uids'
+
+
 @dataclass
 class OrderShortcut:
     command: str
@@ -64,167 +73,132 @@ def is_digit(data: str) -> bool:
         return True
 
 
-async def make_export_file(orders: list[Order]) -> BytesIO:
-    '''Makes XLSX file and return it.
+def parse_order_shortcuts(
+    text: str, agents: AgentDirectory
+) -> tuple[list[dict], list[str]]:
+    '''Parses "create_order;name;price;agent" lines.
 
     Args:
-        orders (list[Order]): Array of Orders.
+        text (str): Message text, one order per line.
+        agents (AgentDirectory): Agents directory.
 
     Returns:
-        BytesIO: XLSX file.
+        tuple[list[dict], list[str]]: Orders and errors.
     '''
-    period = (
-        orders[0].start_date,
-        orders[::-1][0].start_date
-    )
-    wb = Workbook()
-    ws = wb.active
-    ws.title = f'с {str(period[0])} по {str(period[1])}'
-    ws['A1'] = '№ Заказа'
-    ws['A1'].font = Font(bold=True)
-    ws['B1'] = 'Цель'
-    ws['B1'].font = Font(bold=True)
-    ws['C1'] = 'Цена'
-    ws['C1'].font = Font(bold=True)
-    ws['D1'] = 'Агент'
-    ws['D1'].font = Font(bold=True)
-    ws['E1'] = 'Дата начала'
-    ws['E1'].font = Font(bold=True)
-    ws['F1'] = 'Дата оплаты'
-    ws['F1'].font = Font(bold=True)
-    rid = 2
-    for order in orders:
-        ws[f'A{rid}'] = order.uid
-        ws[f'B{rid}'] = order.name
-        if order.price:
-            ws[f'C{rid}'] = order.price
-        else:
-            ws[f'C{rid}'] = 'Н/д'
-        ws[f'D{rid}'] = order.agent.name
-        ws[f'E{rid}'] = str(order.start_date)
-        if order.end_date:
-            ws[f'F{rid}'] = str(order.end_date)
-        else:
-            ws[f'F{rid}'] = 'Не оплачен'
-        rid += 1
-    buf = BytesIO()
-    wb.save(buf)
-    buf.seek(0)
-    return buf
-
-
-def is_order_cmd(payload: str | None) -> bool:
-    if payload:
-        return json.loads(payload).get('command', '').startswith('order#')
-    return False
-
-
-def is_del_order_cmd(payload: str | None) -> bool:
-    if payload:
-        return json.loads(payload).get('command', '').startswith('del_order#')
-    return False
-
-
-def is_end_order_cmd(payload: str | None) -> bool:
-    if payload:
-        return json.loads(payload).get('command', '').startswith('end_order#')
-    return False
+    orders = []
+    errors = []
+    for num, line in enumerate(text.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            order = OrderShortcut(*line.split(';'))
+        except TypeError:
+            errors.append(f'Строка {num}: Неверный синтаксис!')
+            continue
+        if order.command.lower() != 'create_order':
+            errors.append(f'Строка {num}: Неверный синтаксис!')
+            continue
+        agent = agents.find(order.agent)
+        if not agent:
+            error = f'Строка {num}: Агент {order.agent} не найден!'
+            similar = agents.match(order.agent)
+            if similar:
+                error += ' Возможно: ' + ', '.join(a.name for a in similar)
+            errors.append(error)
+        if not is_digit(order.price):
+            errors.append(f'Строка {num}: Цена заказа не число!')
+        if agent and is_digit(order.price):
+            orders.append({
+                'name': order.name, 'price': int(order.price),
+                'agent_uid': agent.uid, 'agent_name': agent.name
+            })
+    return orders, errors
+
+
+def get_orders_verify_str(orders: list[dict], limit: int = 30) -> str:
+    '''Returns text for orders creation confirmation.
 
+    Args:
+        orders (list[dict]): Orders from `parse_order_shortcuts`.
+        limit (int, optional): Max listed orders. Defaults to 30.
 
-def is_set_price_order_cmd(payload: str | None) -> bool:
-    if payload:
-        return json.loads(payload).get('command', '').startswith('set_price_order#')
-    return False
+    Returns:
+        str: Message text.
+    '''
+    if len(orders) == 1:
+        cnt = 'Подтвердите заказ:\n\n'
+        cnt += f'Цель: {orders[0]["name"]}\n'
+        cnt += f'Цена: {orders[0]["price"]}\n'
+        cnt += f'Агент: {orders[0]["agent_name"]}\n\n'
+        cnt += 'Создать заказ?'
+        return cnt
+    cnt = f'Подтвердите заказы ({len(orders)}):\n\n'
+    for order in orders[:limit]:
+        cnt += f'{order["name"]} - {order["price"]} руб. ' \
+               f'({order["agent_name"]})\n'
+    if len(orders) > limit:
+        cnt += f'...и ещё {len(orders) - limit}\n'
+    cnt += f'\nИтого: {sum(o["price"] for o in orders)} руб.\n\n'
+    cnt += 'Создать заказы?'
+    return cnt
 
 
 @bp.on.private_message(FuncRule(
     lambda m: m.text.lower().split(';')[0] == 'create_order'
 ))
 async def create_order_shortcut(msg: Message):
-    user = await msg.get_user()
+    user, agents = await gather(
+        profiles.get(msg.from_id), Database.get_agent_directory()
+    )
     log.info(f'Called by {user.first_name} {user.last_name} ({user.id})')
-    try:
-        order = OrderShortcut(*msg.text.split(';'))
-    except TypeError:
-        log.warning(
-            f'User #{msg.peer_id} use incorrect syntax for '
-            'order creation shortcut!'
-        )
-        await bp.state_dispenser.delete(msg.peer_id)
-        await msg.answer(
-            'ОШИБКА: Неверный синтаксис!',
-            keyboard=keys.back('orders')
-        )
-        return
-    agents = await Database.get_agents()
-    agent_l = list(filter(
-        lambda a: a.name.lower() == order.agent.lower(), agents
-    ))
-    if not agent_l:
-        log.warning(
-            f'User #{msg.peer_id} selected unexistsing '
-            f'Agent name: {order.agent}'
-        )
-        await bp.state_dispenser.delete(msg.peer_id)
-        await msg.answer(
-            'ОШИБКА: Выбранный Агент не найден!',
-            keyboard=keys.back('orders')
-        )
-        return
-    else:
-        agent = agent_l[0]
-    if not is_digit(order.price):
+    orders, errors = parse_order_shortcuts(msg.text, agents)
+    if errors or not orders:
         log.warning(
-            f'User #{msg.peer_id} use not digit in order price!'
+            f'User #{msg.peer_id} use incorrect order creation shortcut: '
+            f'{errors}'
         )
         await bp.state_dispenser.delete(msg.peer_id)
         await msg.answer(
-            'ОШИБКА: Цена заказа не число!',
+            'ОШИБКА:\n' + ('\n'.join(errors) or 'Неверный синтаксис!'),
             keyboard=keys.back('orders')
         )
         return
     await bp.state_dispenser.set(
-        msg.peer_id, AddOrder.VERIFY, agent_uid=agent.uid,
-        name=order.name, price=int(order.price)
+        msg.peer_id, AddOrder.VERIFY, orders=orders
     )
-    cnt = 'Подтвердите заказ:\n\n'
-    cnt += f'Цель: {order.name}\n'
-    cnt += f'Цена: {order.price}\n'
-    cnt += f'Агент: {agent.name}\n\n'
-    cnt += 'Создать заказ?'
-    await msg.answer(cnt, keyboard=keys.verify())
+    await msg.answer(get_orders_verify_str(orders), keyboard=keys.verify())
 
 
 @bp.on.private_message(FuncRule(
     lambda m: m.text.lower() in ['/orders', 'заказы']
 ))
-@bp.on.private_message(payload={'command': 'orders'})
-async def orders(msg: Message):
-    user = await msg.get_user()
+@commands('orders', after=int, before=int)
+async def orders(
+    msg: Message, after: int | None = None, before: int | None = None
+):
+    # Page is read with stats, it is empty without in-progress orders.
+    user, stats, inprog_orders = await gather(
+        profiles.get(msg.from_id), Database.get_orders_stats(),
+        Database.get_inprogress_orders_page(after or 0, before)
+    )
     log.info(f'Called by {user.first_name} {user.last_name} ({user.id})')
-    orders = await Database.get_orders()
-    inprog_orders = list(filter(
-        (lambda o: not o.end_date),
-        orders
-    ))
-    if not inprog_orders:
-        cnt = 'Все заказы выполнены. Добавьте новый!'
-    elif not orders:
+    if not stats.total_count:
         cnt = 'Заказы отсутствуют. Добавьте новый!'
+    elif not stats.inprogress_count:
+        cnt = 'Все заказы выполнены. Добавьте новый!'
     else:
-        cnt = 'Текущие заказы:\n\n'
-        full_price = 0
-        for ord in inprog_orders:
+        cnt = f'Текущие заказы ({stats.inprogress_count}):\n\n'
+        for ord in inprog_orders.items:
             cnt += f'{ord.get_short_str()}\n'
-            if ord.price:
-                full_price += ord.price
-        cnt += f'\nИтого: {full_price} руб.'
-    await msg.answer(cnt, keyboard=keys.orders(inprog_orders, bool(orders)))
+        cnt += f'\nИтого: {stats.inprogress_sum} руб.'
+    await msg.answer(cnt, keyboard=keys.orders(
+        inprog_orders, bool(stats.total_count)
+    ))
 
 
-@bp.on.private_message(payload={'command': 'add_order'})
+@commands('add_order')
 async def start_add_order(msg: Message):
-    user = await msg.get_user()
+    user = await profiles.get(msg.from_id)
     log.info(f'Called by {user.first_name} {user.last_name} ({user.id})')
     await bp.state_dispenser.set(msg.peer_id, AddOrder.NAME)
     await msg.answer(
@@ -235,7 +209,7 @@ async def start_add_order(msg: Message):
 
 @bp.on.private_message(StateRule(AddOrder.NAME))
 async def add_order_name(msg: Message):
-    user = await msg.get_user()
+    user = await profiles.get(msg.from_id)
     log.info(f'Called by {user.first_name} {user.last_name} ({user.id})')
     if msg.text.lower() == 'назад':
         await bp.state_dispenser.delete(msg.peer_id)
@@ -251,7 +225,7 @@ async def add_order_name(msg: Message):
 
 @bp.on.private_message(StateRule(AddOrder.PRICE))
 async def add_order_price(msg: Message):
-    user = await msg.get_user()
+    user = await profiles.get(msg.from_id)
     log.info(f'Called by {user.first_name} {user.last_name} ({user.id})')
     if msg.text.lower() == 'назад':
         await bp.state_dispenser.delete(msg.peer_id)
@@ -265,8 +239,8 @@ async def add_order_price(msg: Message):
             keyboard=keys.back('orders')
         )
         return
-    agents = await Database.get_agents()
-    if agents:
+    agents = await Database.get_agents_page()
+    if agents.items:
         if msg.text.lower() != 'Нету цены':
             price = None
         else:
@@ -284,15 +258,25 @@ async def add_order_price(msg: Message):
     await msg.answer(cnt, keyboard=key)
 
 
-@bp.on.private_message(StateRule(AddOrder.AGENT))
-async def verify_add_order(msg: Message):
-    user = await msg.get_user()
+@commands('add_order_agents', state=AddOrder.AGENT, after=int, before=int)
+async def add_order_agents_page(
+    msg: Message, after: int | None = None, before: int | None = None
+):
+    user, agents = await gather(
+        profiles.get(msg.from_id), Database.get_agents_page(after or 0, before)
+    )
+    log.info(f'Called by {user.first_name} {user.last_name} ({user.id})')
+    await msg.answer('Выберите агента', keyboard=keys.add_order_agents(agents))
+
+
+@commands('add_order_agent', state=AddOrder.AGENT, agent_uid=int)
+async def verify_add_order(msg: Message, agent_uid: int):
+    user, agent = await gather(
+        profiles.get(msg.from_id), Database.get_agent_by_uid(agent_uid)
+    )
     log.info(f'Called by {user.first_name} {user.last_name} ({user.id})')
     cnt = 'Подтвердите заказ:\n\n'
-    m_payload: dict = msg.get_payload_json()  # type: ignore
-    agent_uid = int(m_payload.get('agent_uid', ''))
     s_payload = msg.state_peer.payload  # type: ignore
-    agent = await Database.get_agent_by_uid(agent_uid)
     if not agent:
         log.warning(
             f'User #{msg.peer_id} selected unexistsing Agent UID: {agent_uid}'
@@ -319,10 +303,19 @@ async def verify_add_order(msg: Message):
 
 @bp.on.private_message(StateRule(AddOrder.VERIFY))
 async def add_order_end(msg: Message):
-    user = await msg.get_user()
+    user = await profiles.get(msg.from_id)
     log.info(f'Called by {user.first_name} {user.last_name} ({user.id})')
-    if msg.text in keys.YES_TEXTS:
-        payload = msg.state_peer.payload  # type: ignore
+    payload = msg.state_peer.payload  # type: ignore
+    if msg.text in keys.YES_TEXTS and payload.get('orders'):
+        orders = await Database.add_orders(payload['orders'])
+        if len(orders) == 1:
+            cnt = f'Заказ #{orders[0].uid} - создан!'
+            key = keys.order_btn(orders[0].uid)
+        else:
+            cnt = f'Заказы #{orders[0].uid} - #{orders[-1].uid} ' \
+                  f'({len(orders)}) - созданы!'
+            key = keys.back('orders')
+    elif msg.text in keys.YES_TEXTS:
         if payload.get('price'):
             price = int(payload.get('price'))
         else:
@@ -336,18 +329,16 @@ async def add_order_end(msg: Message):
     else:
         cnt = 'Операция отменена!'
         key = keys.back('orders')
-    Database.get_order_by_uid.cache_clear()
     await bp.state_dispenser.delete(msg.peer_id)
     await msg.answer(cnt, keyboard=key)
 
 
-@bp.on.private_message(FuncRule(lambda m: is_order_cmd(m.payload)))
-async def order(msg: Message):
-    user = await msg.get_user()
+@commands('order', uid=int)
+async def order(msg: Message, uid: int):
+    user, order = await gather(
+        profiles.get(msg.from_id), Database.get_order_by_uid(uid)
+    )
     log.info(f'Called by {user.first_name} {user.last_name} ({user.id})')
-    msg_payload_json: dict = msg.get_payload_json()  # type: ignore
-    order_uid = int(msg_payload_json.get('command', '#').split('#')[1])
-    order = await Database.get_order_by_uid(order_uid)
     if order:
         await msg.answer(
             order.get_full_str(),
@@ -355,71 +346,158 @@ async def order(msg: Message):
         )
     else:
         await msg.answer(
-            f'ОШИБКА: Заказ #{order_uid} - не найден!',
+            f'ОШИБКА: Заказ #{uid} - не найден!',
             keyboard=keys.back('orders')
         )
 
 
-@bp.on.private_message(payload={'command': 'orders_history'})
-async def orders_history(msg: Message):
-    user = await msg.get_user()
+@commands('orders_history', after=int, before=int)
+async def orders_history(
+    msg: Message, after: int | None = None, before: int | None = None
+):
+    # Totals are from stats, only one page of orders is listed.
+    user, stats, ended = await gather(
+        profiles.get(msg.from_id), Database.get_orders_stats(),
+        Database.get_ended_orders_page(after or 0, before)
+    )
     log.info(f'Called by {user.first_name} {user.last_name} ({user.id})')
-    orders = await Database.get_orders()
-    if orders:
-        ended_orders = filter(
-            (lambda o: o.end_date),
-            orders
-        )
-        cnt = 'Оплаченые заказы:\n\n'
-        flag = False
-        full_price = 0
-        for ord in ended_orders:
-            flag = True
-            cnt += f'{ord.get_short_str()}\n'
-            if ord.price:
-                full_price += ord.price
-        if not flag:
+    if stats.total_count:
+        cnt = f'Оплаченые заказы ({stats.paid_count}):\n\n'
+        if not stats.paid_count:
             cnt += 'Пока-что ни один заказ не был оплачен.'
         else:
-            cnt += f'\nИтого: {full_price} руб.'
+            for ord in ended.items:
+                cnt += f'{ord.get_short_str()}\n'
+            cnt += f'\nИтого: {stats.paid_sum} руб.'
     else:
         cnt = 'Заказы отсутствуют.'
     await msg.answer(
-        cnt, keyboard=keys.orders_history()
+        cnt, keyboard=keys.orders_history(ended)
     )
 
 
-@bp.on.private_message(FuncRule(lambda m: is_del_order_cmd(m.payload)))
-async def del_order(msg: Message):
-    user = await msg.get_user()
+@commands('del_order', uid=int)
+async def del_order(msg: Message, uid: int):
+    user = await profiles.get(msg.from_id)
     log.info(f'Called by {user.first_name} {user.last_name} ({user.id})')
-    msg_payload_json: dict = msg.get_payload_json()  # type: ignore
-    order_uid = int(msg_payload_json.get('command', '#').split('#')[1])
-    await Database.del_order(order_uid)
-    Database.get_order_by_uid.cache_clear()
+    if await Database.del_order(uid):
+        cnt = f'Заказ #{uid} - удалён!'
+    else:
+        cnt = f'Заказ #{uid} - не найден!'
+    await msg.answer(cnt, keyboard=keys.back('orders'))
+
+
+@commands('end_order', uid=int)
+async def end_order(msg: Message, uid: int):
+    user = await profiles.get(msg.from_id)
+    log.info(f'Called by {user.first_name} {user.last_name} ({user.id})')
+    if await Database.end_order(uid):
+        cnt = f'Заказ #{uid} - оплачен!'
+    else:
+        cnt = f'Заказ #{uid} - не найден или уже оплачен!'
+    await msg.answer(cnt, keyboard=keys.back('orders'))
+
+
+def get_select_orders_cnt(selected: list[int]) -> str:
+    '''Returns orders multi-select message text.
+
+    Args:
+        selected (list[int]): Selected orders UIDs.
+
+    Returns:
+        str: Message text.
+    '''
+    if selected:
+        return f'Выберите заказы\n\nВыбрано: {len(selected)}'
+    return 'Выберите заказы\n\nНи один заказ не выбран.'
+
+
+def get_select_orders_state(msg: Message) -> dict:
+    '''Returns multi-select state payload, if selecting now.
+
+    Args:
+        msg (Message): VK message.
+
+    Returns:
+        dict: State payload.
+    '''
+    if msg.state_peer and 'selected' in (msg.state_peer.payload or {}):
+        return msg.state_peer.payload  # type: ignore
+    return {}
+
+
+@commands('select_orders', after=int, before=int)
+async def select_orders(
+    msg: Message, after: int | None = None, before: int | None = None
+):
+    user = await profiles.get(msg.from_id)
+    log.info(f'Called by {user.first_name} {user.last_name} ({user.id})')
+    # Without cursor it is new selection, not page switch.
+    if after is None and before is None:
+        selected = []
+    else:
+        selected = get_select_orders_state(msg).get('selected', [])
+    after = after or 0
+    _, orders = await gather(
+        bp.state_dispenser.set(
+            msg.peer_id, SelectOrders.UIDS, selected=selected,
+            after=after, before=before
+        ),
+        Database.get_inprogress_orders_page(after, before)
+    )
     await msg.answer(
-        f'Заказ #{order_uid} - удалён!',
-        keyboard=keys.back('orders')
+        get_select_orders_cnt(selected),
+        keyboard=keys.orders_select(orders, selected)
     )
 
 
-@bp.on.private_message(FuncRule(lambda m: is_end_order_cmd(m.payload)))
-async def end_order(msg: Message):
-    user = await msg.get_user()
+@commands('select_order', uid=int)
+async def select_order(msg: Message, uid: int):
+    user = await profiles.get(msg.from_id)
     log.info(f'Called by {user.first_name} {user.last_name} ({user.id})')
-    msg_payload_json: dict = msg.get_payload_json()  # type: ignore
-    order_uid = int(msg_payload_json.get('command', '#').split('#')[1])
-    await Database.end_order(order_uid)
-    Database.get_order_by_uid.cache_clear()
+    s_payload = get_select_orders_state(msg)
+    selected = s_payload.get('selected', [])
+    if uid in selected:
+        selected.remove(uid)
+    else:
+        selected.append(uid)
+    _, orders = await gather(
+        bp.state_dispenser.set(
+            msg.peer_id, SelectOrders.UIDS, selected=selected,
+            after=s_payload.get('after', 0), before=s_payload.get('before')
+        ),
+        Database.get_inprogress_orders_page(
+            s_payload.get('after', 0), s_payload.get('before')
+        )
+    )
     await msg.answer(
-        f'Заказ #{order_uid} - оплачен!',
-        keyboard=keys.back('orders')
+        get_select_orders_cnt(selected),
+        keyboard=keys.orders_select(orders, selected)
     )
 
 
-@bp.on.private_message(payload={'command': 'order_info'})
+@commands('select_orders_end')
+@commands('select_orders_del')
+async def select_orders_end(msg: Message, command: Command):
+    user = await profiles.get(msg.from_id)
+    log.info(f'Called by {user.first_name} {user.last_name} ({user.id})')
+    selected = get_select_orders_state(msg).get('selected', [])
+    await bp.state_dispenser.delete(msg.peer_id)
+    if not selected:
+        cnt = 'Ни один заказ не выбран.'
+    elif command.action == 'select_orders_end':
+        ended = await Database.end_orders(selected)
+        cnt = f'Оплачено заказов: {len(ended)}'
+    else:
+        deleted = await Database.del_orders(selected)
+        cnt = f'Удалено заказов: {len(deleted)}'
+    await msg.answer(cnt)
+    await orders(msg)
+
+
+@commands('order_info')
 async def order_info_start(msg: Message):
-    user = await msg.get_user()
+    user = await profiles.get(msg.from_id)
     log.info(f'Called by {user.first_name} {user.last_name} ({user.id})')
     await bp.state_dispenser.set(msg.peer_id, OrderInfo.UID)
     await msg.answer(
@@ -430,7 +508,7 @@ async def order_info_start(msg: Message):
 
 @bp.on.private_message(StateRule(OrderInfo.UID))
 async def end_order_info(msg: Message):
-    user = await msg.get_user()
+    user = await profiles.get(msg.from_id)
     log.info(f'Called by {user.first_name} {user.last_name} ({user.id})')
     if not msg.text.isdigit():
         await msg.answer(
@@ -451,26 +529,86 @@ async def end_order_info(msg: Message):
         )
 
 
-@bp.on.message(payload={'command': 'orders_history_export'})
+async def send_export(msg: Message, flt: ExportFilter) -> None:
+    '''Sends orders export, reuses uploaded doc if data is not changed.
+
+    Delta export contains orders changed since last delta export
+    to this chat.
+
+    Args:
+        msg (Message): Any message in chat.
+        flt (ExportFilter): Orders filter.
+    '''
+    recipient = f'vk:{msg.peer_id}'
+    mark = version = doc = None
+    if flt.delta:
+        mark, changed_after = await gather(
+            Database.get_export_mark(),
+            Database.get_export_watermark(recipient)
+        )
+        flt = ExportFilter(changed_after=changed_after, changed_before=mark)
+    else:
+        version = (flt, await Database.get_export_version())
+        doc = get_uploaded_export(msg.peer_id, version)
+    if doc is None:
+        wait_msg, (file, period) = await gather(
+            msg.answer('Файл готовится...'),
+            make_export_file(Database.iterate_orders(flt), flt)
+        )
+        with file:
+            if period is not None:
+                uploader = DocMessagesUploader(bp.api)
+                doc = await uploader.upload(
+                    get_export_file_name(period), file.read(),
+                    peer_id=msg.peer_id
+                )  # type: ignore
+        await bp.api.messages.delete(
+            wait_msg.message_id, peer_id=wait_msg.peer_id,  # type: ignore
+            delete_for_all=True
+        )
+        if doc and not mark:
+            set_uploaded_export(msg.peer_id, version, doc)
+    if doc is None:
+        await msg.answer(
+            'Заказы для отчёта не найдены.', keyboard=keys.start()
+        )
+    else:
+        await msg.answer(
+            'Файл готов!', attachment=doc, keyboard=keys.start()
+        )
+    if mark:
+        await Database.set_export_watermark(recipient, mark)
+
+
+@commands('orders_history_export', private=False)
 async def orders_history_export(msg: Message):
-    user = await msg.get_user()
+    user = await profiles.get(msg.from_id)
     log.info(f'Called by {user.first_name} {user.last_name} ({user.id})')
-    wait_msg = await msg.answer('Файл готовится...')
-    orders = await Database.get_orders()
-    file = await make_export_file(orders)
-    period = (
-        orders[0].start_date,
-        orders[::-1][0].start_date
-    )
-    file_name = f'Отчёт с {str(period[0])} по {str(period[1])}.xlsx'
-    uploader = DocMessagesUploader(bp.api)
-    doc: str = await uploader.upload(
-        file_name, file, peer_id=msg.peer_id
-    )  # type: ignore
-    await bp.api.messages.delete(
-        wait_msg.message_id, peer_id=wait_msg.peer_id,  # type: ignore
-        delete_for_all=True
-    )
     await msg.answer(
-        'Файл готов!', attachment=doc, keyboard=keys.start()
+        'Выберите отчёт или отправьте команду:\n\n' + EXPORT_COMMAND_HELP,
+        keyboard=keys.export_presets(EXPORT_PRESETS)
+    )
+
+
+@commands('export', private=False, preset=str)
+async def export_preset(msg: Message, preset: str = ''):
+    user = await profiles.get(msg.from_id)
+    log.info(f'Called by {user.first_name} {user.last_name} ({user.id})')
+    await send_export(msg, get_export_preset(preset))
+
+
+@bp.on.private_message(FuncRule(
+    lambda m: m.text.lower().split(';')[0] == 'export'
+))
+async def export_command(msg: Message):
+    user, agents = await gather(
+        profiles.get(msg.from_id), Database.get_agent_directory()
     )
+    log.info(f'Called by {user.first_name} {user.last_name} ({user.id})')
+    flt, errors = parse_export_command(msg.text, agents)
+    if flt is None:
+        await msg.answer(
+            'ОШИБКА:\n' + '\n'.join(errors) + '\n\n' + EXPORT_COMMAND_HELP
+        )
+        return
+    await send_export(msg, flt)
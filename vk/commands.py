@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+#
+#  MoneyTracker: Button payload commands & router.
+#  Created by LulzLoL231 at 18/10/26
+#
+import json
+import inspect
+import logging
+from typing import Any, Awaitable, Callable, NamedTuple
+
+from vkbottle.bot import Message
+from vkbottle import BaseMiddleware, BaseStateGroup
+from vkbottle.dispatch.dispenser.base import get_state_repr
+
+
+# Peer IDs of group chats start from it.
+CHAT_PEER_ID = 2_000_000_000
+log = logging.getLogger('MoneyTracker')
+# Old "<action>#<N>" payloads and their N arg name.
+LEGACY_ARGS = {
+    'order': 'uid',
+    'del_order': 'uid',
+    'end_order': 'uid',
+    'set_price_order': 'uid',
+    'del_agent': 'uid'
+}
+
+
+def pack(action: str, **args: Any) -> dict:
+    '''Returns button payload, like {"command": "order", "uid": 12}.
+
+    Args:
+        action (str): Command action.
+        **args (Any): Command args, None is "not set".
+
+    Returns:
+        dict: Button payload.
+    '''
+    return {
+        'command': action,
+        **{k: v for k, v in args.items() if v is not None}
+    }
+
+
+class Command(NamedTuple):
+    action: str
+    args: dict[str, Any]
+
+    @classmethod
+    def parse(cls, payload: str | None) -> 'Command | None':
+        '''Decodes message payload.
+
+        Old payloads are decoded as current commands:
+        {"command": "order#12"} as "order" with "uid" arg (see
+        `LEGACY_ARGS`), {"agent_uid": 3} as "add_order_agent"
+        and {"command": "del_agent"} as "del_agents".
+
+        Args:
+            payload (str | None): Message payload JSON.
+
+        Returns:
+            Command | None: Command, None if there is no payload.
+        '''
+        if not payload:
+            return None
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            log.warning(f'Bad payload: {payload}')
+            return None
+        if not isinstance(data, dict):
+            return None
+        action = str(data.pop('command', ''))
+        if '#' in action:
+            name, value = action.split('#', 1)
+            if name in LEGACY_ARGS:
+                action = name
+                data[LEGACY_ARGS[name]] = value
+        elif not action and 'agent_uid' in data:
+            action = 'add_order_agent'
+        elif action == 'del_agent' and 'uid' not in data:
+            action = 'del_agents'
+        return cls(action, data)
+
+
+class Route(NamedTuple):
+    handler: Callable[..., Awaitable[Any]]
+    # None for any state.
+    states: frozenset[str] | None
+    args: dict[str, type]
+    # Args without default value.
+    required: frozenset[str]
+    private: bool
+    with_command: bool
+
+    def parse(self, args: dict[str, Any]) -> dict[str, Any]:
+        '''Converts command args to handler kwargs.
+
+        Raises:
+            ValueError: Required arg is missing or has wrong type.
+        '''
+        kwargs = {}
+        for name, arg_type in self.args.items():
+            value = args.get(name)
+            if value is None or value == '':
+                if name in self.required:
+                    raise ValueError(f'Missing command arg: {name}')
+                continue
+            try:
+                kwargs[name] = arg_type(value)
+            except TypeError as e:
+                raise ValueError(str(e)) from e
+        return kwargs
+
+
+def _get_states(
+    state: BaseStateGroup | list[BaseStateGroup] | None
+) -> frozenset[str] | None:
+    if state is None:
+        return None
+    if not isinstance(state, list):
+        state = [state]
+    return frozenset(get_state_repr(i) for i in state)
+
+
+class CommandRouter:
+    '''Dispatches payload commands by action with one dict lookup.
+    '''
+    def __init__(self) -> None:
+        self.routes: dict[str, list[Route]] = {}
+
+    def __call__(
+        self, action: str,
+        state: BaseStateGroup | list[BaseStateGroup] | None = None,
+        private: bool = True, **args: type
+    ) -> Callable:
+        '''Registers handler for action.
+
+        Handler is called with message, command args as kwargs
+        and "command" if it accepts one.
+
+        Args:
+            action (str): Command action.
+            state (optional): Required state(s). Defaults is any state.
+            private (bool, optional): Only in private messages?
+                Defaults is True.
+            **args (type): Handler args names & types.
+        '''
+        def decorator(handler: Callable) -> Callable:
+            params = inspect.signature(handler).parameters
+            route = Route(
+                handler, _get_states(state), args,
+                frozenset(
+                    i for i in args
+                    if params[i].default is inspect.Parameter.empty
+                ),
+                private, 'command' in params
+            )
+            routes = self.routes.setdefault(action, [])
+            for i in routes:
+                if i.states is None or route.states is None \
+                        or i.states & route.states:
+                    raise ValueError(
+                        f'Action "{action}" handlers states intersect.'
+                    )
+            routes.append(route)
+            return handler
+        return decorator
+
+    async def dispatch(self, msg: Message, command: Command) -> bool:
+        '''Runs command handler.
+
+        Args:
+            msg (Message): VK message.
+            command (Command): Message command.
+
+        Returns:
+            bool: Is command handled?
+        '''
+        current = msg.state_peer.state if msg.state_peer else None
+        for route in self.routes.get(command.action, []):
+            if route.states is not None and current not in route.states:
+                continue
+            if route.private and msg.peer_id >= CHAT_PEER_ID:
+                continue
+            try:
+                kwargs = route.parse(command.args)
+            except ValueError as e:
+                log.warning(f'Bad command {command}: {e}')
+                return False
+            if route.with_command:
+                kwargs['command'] = command
+            try:
+                await route.handler(msg, **kwargs)
+            except Exception:
+                log.exception(f'Command {command} handler failed!')
+            return True
+        return False
+
+
+router = CommandRouter()
+
+
+class CommandMiddleware(BaseMiddleware[Message]):
+    '''Decodes message payload once and runs its `router` handler.
+
+    Not routed command is passed to other handlers as "command" kwarg.
+    '''
+    async def pre(self) -> None:
+        command = Command.parse(self.event.payload)
+        if command is None:
+            return
+        if await router.dispatch(self.event, command):
+            self.stop('Handled by command router.')
+        self.send({'command': command})
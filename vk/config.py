@@ -21,6 +21,11 @@ class Config(BaseSettings):
     DEBUG: bool = Field(False, env='BOT_DEBUG')
     token: str = Field(..., env='BOT_TOKEN')
     postgres_dsn: PostgresDsn = Field(..., env='BOT_POSTGRESDSN')
+    page_size: int = Field(8, env='BOT_PAGESIZE')
+    cache_size: int = Field(1024, env='BOT_CACHESIZE')
+    cache_ttl: int = Field(300, env='BOT_CACHETTL')
+    export_limit: int = Field(2, env='BOT_EXPORTLIMIT')
+    profile_ttl: int = Field(3600, env='BOT_PROFILETTL')
 
     class Config:
         env_file = env_file
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+#
+#  MoneyTracker: Database - Start screen dashboard.
+#  Created by LulzLoL231 at 18/10/26
+#
+from .schemas import OrderStrMixin
+
+
+class Dashboard:
+    '''In-memory in-progress orders summary for start screen.
+
+    Keeps orders short strings and running total, every order change
+    is applied in O(1). Joined text is rendered once after changes.
+    '''
+    def __init__(self) -> None:
+        self.loaded = False
+        # Bumped by every change, see `load`.
+        self.version = 0
+        self.total = 0
+        self._lines: dict[int, tuple[int, str]] = {}
+        self._text: str | None = None
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    @property
+    def text(self) -> str:
+        '''Orders short strings, one per line.
+        '''
+        if self._text is None:
+            self._text = '\n'.join(line for _, line in self._lines.values())
+        return self._text
+
+    def load(self, orders: list[OrderStrMixin], version: int) -> None:
+        '''Replaces dashboard content.
+
+        If there were changes since fetch, content may miss them,
+        so dashboard stays not loaded.
+
+        Args:
+            orders (list[OrderStrMixin]): All in-progress orders.
+            version (int): `version` before orders fetch.
+        '''
+        self._lines.clear()
+        self.total = 0
+        for order in orders:
+            self._put(order)
+        self._text = None
+        self.loaded = version == self.version
+
+    def clear(self) -> None:
+        '''Drops dashboard content, it must be loaded again.
+        '''
+        self.version += 1
+        self.loaded = False
+        self.total = 0
+        self._lines.clear()
+        self._text = None
+
+    def apply(self, order: OrderStrMixin) -> None:
+        '''Adds, updates or removes changed order.
+
+        Args:
+            order (OrderStrMixin): Created or updated order.
+        '''
+        if order.end_date is not None:
+            self.discard(order.uid)
+            return
+        self.version += 1
+        if self.loaded:
+            self._put(order)
+            self._text = None
+
+    def discard(self, uid: int) -> None:
+        '''Removes ended or deleted order.
+
+        Args:
+            uid (int): Order UID.
+        '''
+        self.version += 1
+        line = self._lines.pop(uid, None)
+        if line is not None:
+            self.total -= line[0]
+            self._text = None
+
+    def _put(self, order: OrderStrMixin) -> None:
+        price = order.price or 0
+        old = self._lines.get(order.uid)
+        if old is not None:
+            self.total -= old[0]
+        self._lines[order.uid] = (price, order.get_short_str())
+        self.total += price
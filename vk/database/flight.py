@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+#
+#  MoneyTracker: Database - Single-flight reads.
+#  Created by LulzLoL231 at 18/10/26
+#
+import asyncio
+from functools import wraps
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+
+T = TypeVar('T')
+
+
+class SingleFlight:
+    '''Coalesces concurrent calls of read methods with the same arguments.
+
+    Callers share one in-flight task and its result, so results must not
+    be mutated. Reads must not run in transaction: task is shared with
+    callers outside of it.
+    '''
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    def __call__(
+        self, func: Callable[..., Awaitable[T]]
+    ) -> Callable[..., Awaitable[T]]:
+        '''Decorates read method.
+        '''
+        @wraps(func)
+        async def wrapper(*args, **kwargs) -> T:
+            key = (func, args, tuple(sorted(kwargs.items())))
+            call = self._calls.get(key)
+            if call is None:
+                call = asyncio.ensure_future(func(*args, **kwargs))
+                self._calls[key] = call
+                call.add_done_callback(lambda f: self._done(key, f))
+            # One cancelled caller must not cancel the others.
+            return await asyncio.shield(call)
+        return wrapper
+
+    def invalidates(
+        self, func: Callable[..., Awaitable[T]]
+    ) -> Callable[..., Awaitable[T]]:
+        '''Decorates write method, reads after it are not joined
+        with reads started before its end.
+
+        Write transaction must be committed inside method, so reads
+        started after its end see the change.
+        '''
+        @wraps(func)
+        async def wrapper(*args, **kwargs) -> T:
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self.forget()
+        return wrapper
+
+    def forget(self) -> None:
+        '''Next calls start new tasks, running ones finish for their callers.
+        '''
+        self._calls.clear()
+
+    def _done(self, key: Hashable, call: asyncio.Future) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.cancelled():
+            # Marks exception as retrieved, if all callers are cancelled.
+            call.exception()
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+#
+#  MoneyTracker: Database - Migrations.
+#  Created by LulzLoL231 at 18/10/26
+#
+import logging
+
+from databases import Database as DB
+
+
+log = logging.getLogger('MoneyTrackerDB')
+# Any constant, same for all bots using one DB.
+LOCK_ID = 0x4D54
+# Each migration is an array of SQL statements. Never change applied ones,
+# append a new migration instead. Migration number is index + 1.
+MIGRATIONS: list[list[str]] = [
+    # 1: Initial schema, as was created by metadata.create_all().
+    [
+        '''CREATE TABLE IF NOT EXISTS agents (
+            uid SERIAL NOT NULL,
+            name TEXT,
+            PRIMARY KEY (uid)
+        )''',
+        '''CREATE TABLE IF NOT EXISTS orders (
+            uid SERIAL NOT NULL,
+            name TEXT,
+            price INTEGER,
+            agent_uid INTEGER,
+            start_date DATE,
+            end_date DATE,
+            PRIMARY KEY (uid),
+            FOREIGN KEY(agent_uid) REFERENCES agents (uid)
+        )'''
+    ],
+    # 2: Indexes for in-progress list, agent lookups and date ranges.
+    [
+        '''CREATE INDEX IF NOT EXISTS orders_inprogress_idx
+            ON orders (uid) WHERE end_date IS NULL''',
+        '''CREATE INDEX IF NOT EXISTS orders_agent_uid_idx
+            ON orders (agent_uid)''',
+        '''CREATE INDEX IF NOT EXISTS orders_start_date_idx
+            ON orders (start_date)''',
+        '''CREATE INDEX IF NOT EXISTS orders_end_date_idx
+            ON orders (end_date)''',
+        '''CREATE INDEX IF NOT EXISTS agents_name_lower_idx
+            ON agents (lower(name))'''
+    ],
+    # 3: Last modification time, for exports data version.
+    [
+        '''ALTER TABLE orders ADD COLUMN IF NOT EXISTS
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now()'''
+    ],
+    # 4: Delta exports, see `Database.get_export_mark`.
+    [
+        '''CREATE INDEX IF NOT EXISTS orders_updated_at_idx
+            ON orders (updated_at)''',
+        '''CREATE TABLE IF NOT EXISTS export_watermarks (
+            recipient TEXT NOT NULL,
+            exported_at TIMESTAMPTZ NOT NULL,
+            PRIMARY KEY (recipient)
+        )'''
+    ],
+    # 5: Index for paid orders history pages.
+    [
+        '''CREATE INDEX IF NOT EXISTS orders_ended_idx
+            ON orders (uid) WHERE end_date IS NOT NULL'''
+    ]
+]
+LATEST = len(MIGRATIONS)
+
+
+async def get_version(db: DB) -> int:
+    '''Returns current schema version.
+
+    Args:
+        db (DB): Connected database.
+
+    Returns:
+        int: Schema version, 0 if DB is empty.
+    '''
+    if not await db.fetch_val("SELECT to_regclass('schema_version')"):
+        return 0
+    return await db.fetch_val(
+        'SELECT coalesce(max(version), 0) FROM schema_version'
+    )
+
+
+async def migrate(db: DB) -> int:
+    '''Applies not applied migrations.
+
+    Args:
+        db (DB): Connected database.
+
+    Returns:
+        int: Schema version after migrations.
+    '''
+    version = await get_version(db)
+    if version >= LATEST:
+        log.debug(f'Schema is up to date (v{version}).')
+        return version
+    async with db.transaction():
+        # Other bot can migrate the same DB right now.
+        await db.execute(f'SELECT pg_advisory_xact_lock({LOCK_ID})')
+        await db.execute(
+            '''CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER NOT NULL,
+                applied_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+                PRIMARY KEY (version)
+            )'''
+        )
+        version = await get_version(db)
+        for num in range(version + 1, LATEST + 1):
+            log.info(f'Applying migration #{num}...')
+            for stmt in MIGRATIONS[num - 1]:
+                await db.execute(stmt)
+            await db.execute(
+                'INSERT INTO schema_version (version) VALUES (:version)',
+                {'version': num}
+            )
+            version = num
+    return version
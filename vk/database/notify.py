@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+#
+#  MoneyTracker: Database - Change notifications.
+#  Created by LulzLoL231 at 18/10/26
+#
+import json
+import asyncio
+import logging
+from typing import Callable
+
+import asyncpg
+from databases import DatabaseURL
+
+
+CHANNEL = 'moneytracker_changes'
+# pg_notify payload must be shorter than 8000 bytes.
+MAX_UIDS = 500
+
+
+def make_payload(origin: str, table: str, uids: list[int] | None) -> str:
+    '''Makes change event payload.
+
+    Args:
+        origin (str): Publisher process ID.
+        table (str): Changed table name.
+        uids (list[int] | None): Changed rows UIDs, None for "all rows".
+
+    Returns:
+        str: JSON string.
+    '''
+    if uids is not None and len(uids) > MAX_UIDS:
+        uids = None
+    return json.dumps({'origin': origin, 'table': table, 'uids': uids})
+
+
+class ChangeListener:
+    '''LISTENs for change events on own connection.
+
+    Args:
+        dsn (str): PostgreSQL DSN.
+        callback (Callable[[dict], None]): Called with every event.
+        on_lost (Callable[[], None]): Called when events may be missed.
+    '''
+    log = logging.getLogger('MoneyTrackerDB')
+    reconnect_delay = 5
+
+    def __init__(
+        self, dsn: str, callback: Callable[[dict], None],
+        on_lost: Callable[[], None]
+    ) -> None:
+        self.dsn = str(DatabaseURL(dsn).replace(driver=''))
+        self.callback = callback
+        self.on_lost = on_lost
+        self._conn: asyncpg.Connection | None = None
+        self._reconnect: asyncio.Task | None = None
+        self._closed = True
+
+    async def start(self) -> None:
+        '''Connects and starts listening.
+        '''
+        self._closed = False
+        self._conn = await asyncpg.connect(self.dsn)
+        self._conn.add_termination_listener(self._on_terminate)
+        await self._conn.add_listener(CHANNEL, self._on_notify)
+
+    async def stop(self) -> None:
+        '''Stops listening and closes connection.
+        '''
+        self._closed = True
+        if self._reconnect:
+            self._reconnect.cancel()
+            self._reconnect = None
+        if self._conn and not self._conn.is_closed():
+            await self._conn.close()
+        self._conn = None
+
+    def _on_notify(self, conn, pid: int, channel: str, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            self.log.error(f'Bad change event payload: {payload}')
+            return
+        self.callback(event)
+
+    def _on_terminate(self, conn) -> None:
+        if self._closed:
+            return
+        self.log.warning('LISTEN connection lost, reconnecting...')
+        self.on_lost()
+        self._reconnect = asyncio.get_event_loop().create_task(
+            self._reconnect_loop()
+        )
+
+    async def _reconnect_loop(self) -> None:
+        while not self._closed:
+            await asyncio.sleep(self.reconnect_delay)
+            try:
+                await self.start()
+            except (OSError, asyncpg.PostgresError) as e:
+                self.log.warning(f'LISTEN reconnect failed: {e}')
+            else:
+                # Events between disconnect and now are lost.
+                self.on_lost()
+                self.log.info('LISTEN connection restored.')
+                return
@@ -3,9 +3,14 @@
 #  MoneyTracker: Database - Types.
 #  Created by LulzLoL231 27/06/22
 #
-from datetime import date
+from datetime import date, datetime
+from typing import Generic, TypeVar
 
 from pydantic import BaseModel
+from pydantic.generics import GenericModel
+
+
+T = TypeVar('T')
 
 
 class Agent(BaseModel):
@@ -14,19 +19,62 @@ class Agent(BaseModel):
 
     class Config:
         orm_mode = True
+        # Orders keep a reference to the shared Agent instead of a copy.
+        copy_on_model_validation = 'none'
+
+
+class Page(GenericModel, Generic[T]):
+    items: list[T]
+    has_prev: bool = False
+    has_next: bool = False
+
+    class Config:
+        arbitrary_types_allowed = True
+
+
+class OrdersStats(BaseModel):
+    agent_uid: int | None = None
+    inprogress_count: int = 0
+    inprogress_sum: int = 0
+    paid_count: int = 0
+    paid_sum: int = 0
+
+    class Config:
+        orm_mode = True
+
+    @property
+    def total_count(self) -> int:
+        return self.inprogress_count + self.paid_count
+
+
+class ExportFilter(BaseModel):
+    '''Orders export parameters, None is "any".
+
+    Dates range is applied to end_date for paid orders,
+    to start_date otherwise. Delta export is resolved to changes range
+    by recipient watermark before export.
+    '''
+    date_from: date | None = None
+    date_to: date | None = None
+    agent_uid: int | None = None
+    paid: bool | None = None
+    delta: bool = False
+    changed_after: datetime | None = None
+    changed_before: datetime | None = None
+
+    class Config:
+        # Used as exports cache key.
+        frozen = True
 
 
-class Order(BaseModel):
+class OrderStrMixin:
+    __slots__ = ()
     uid: int
     name: str
-    price: int | None = None
-    agent_uid: int
+    price: int | None
     agent: Agent
     start_date: date
-    end_date: date | None = None
-
-    class Config:
-        orm_mode = True
+    end_date: date | None
 
     def get_full_str(self) -> str:
         tmp_cnt = '''Заказ #{}
@@ -62,3 +110,42 @@ class Order(BaseModel):
             price = f'на сумму {self.price} руб.'
         tmp_cnt = 'Заказ #{} {}'
         return tmp_cnt.format(self.uid, price)
+
+
+class Order(OrderStrMixin, BaseModel):
+    uid: int
+    name: str
+    price: int | None = None
+    agent_uid: int
+    agent: Agent
+    start_date: date
+    end_date: date | None = None
+
+    class Config:
+        orm_mode = True
+
+
+class OrderRow(OrderStrMixin):
+    '''Lightweight Order for bulk reads, not validated.
+
+    Agent is shared between rows of the same agent.
+    '''
+    __slots__ = (
+        'uid', 'name', 'price', 'agent_uid', 'agent',
+        'start_date', 'end_date'
+    )
+
+    def __init__(
+        self, uid: int, name: str, price: int | None, agent_uid: int,
+        agent: Agent, start_date: date, end_date: date | None = None
+    ) -> None:
+        self.uid = uid
+        self.name = name
+        self.price = price
+        self.agent_uid = agent_uid
+        self.agent = agent
+        self.start_date = start_date
+        self.end_date = end_date
+
+    def __repr__(self) -> str:
+        return f'OrderRow(uid={self.uid}, agent_uid={self.agent_uid})'
@@ -5,7 +5,8 @@
 #
 from vkbottle import Keyboard, KeyboardButtonColor, Text
 
-from database.schemas import Agent, Order
+from commands import pack
+from database.schemas import Agent, Order, OrderRow, Page
 
 
 class Keyboards:
@@ -13,6 +14,34 @@ class Keyboards:
         'Да', 'да', 'y', 'yes', 'Yes', 'д'
     ]
 
+    @staticmethod
+    def _add_pages(key: Keyboard, page: Page, command: str) -> None:
+        '''Adds prev & next btns row to keyboard.
+
+        Args:
+            key (Keyboard): VK keyboard with empty last row.
+            page (Page): Page of items with "uid".
+            command (str): Buttons command with "after" & "before" args.
+        '''
+        if page.has_prev:
+            key.add(
+                Text(
+                    '«',
+                    pack(command, before=page.items[0].uid)
+                ),
+                KeyboardButtonColor.SECONDARY
+            )
+        if page.has_next:
+            key.add(
+                Text(
+                    '»',
+                    pack(command, after=page.items[-1].uid)
+                ),
+                KeyboardButtonColor.SECONDARY
+            )
+        if page.has_prev or page.has_next:
+            key.row()
+
     @staticmethod
     def start() -> str:
         '''Returns start keyboard.
@@ -76,7 +105,7 @@ class Keyboards:
         if with_del:
             key.add(
                 Text(
-                    'Удалить агента', {'command': 'del_agent'}
+                    'Удалить агента', {'command': 'del_agents'}
                 ),
                 KeyboardButtonColor.NEGATIVE
             )
@@ -96,25 +125,26 @@ class Keyboards:
         return key.get_json()
 
     @staticmethod
-    def del_agent(agents: list[Agent]) -> str:
+    def del_agent(agents: Page[Agent]) -> str:
         '''Returns keyboards with agents IDs and names.
 
         Args:
-            agents (list[Agent]): Array of Agents.
+            agents (Page[Agent]): Page of Agents.
 
         Returns:
             str: JSON string.
         '''
         key = Keyboard(True)
-        for agent in agents:
+        for agent in agents.items:
             key.add(
                 Text(
                     agent.name,
-                    {'command': f'del_agent#{agent.uid}'}
+                    pack('del_agent', uid=agent.uid)
                 ),
                 KeyboardButtonColor.NEGATIVE
             )
             key.row()
+        Keyboards._add_pages(key, agents, 'del_agents')
         key.add(
             Text(
                 'Назад',
@@ -125,11 +155,11 @@ class Keyboards:
         return key.get_json()
 
     @staticmethod
-    def orders(orders: list[Order], with_his: bool = True) -> str:
+    def orders(orders: Page[OrderRow], with_his: bool = True) -> str:
         '''Returns orders short names keyboard.
 
         Args:
-            orders (list[Order]): Array of orders.
+            orders (Page[OrderRow]): Page of orders.
             with_his (bool): Add history btn? Defaults is True.
 
         Returns:
@@ -137,11 +167,11 @@ class Keyboards:
         '''
         key = Keyboard(True)
         flag = False
-        for ord in orders:
+        for ord in orders.items:
             key.add(
                 Text(
                     f'Заказ #{ord.uid}',
-                    {'command': f'order#{ord.uid}'}
+                    pack('order', uid=ord.uid)
                 ),
                 KeyboardButtonColor.PRIMARY
             )
@@ -152,6 +182,7 @@ class Keyboards:
                 flag = True
         if flag:
             key.row()
+        Keyboards._add_pages(key, orders, 'orders')
         key.add(
             Text(
                 'Добавить',
@@ -159,6 +190,14 @@ class Keyboards:
             ),
             KeyboardButtonColor.POSITIVE
         )
+        if orders.items:
+            key.add(
+                Text(
+                    'Выбрать',
+                    {'command': 'select_orders'}
+                ),
+                KeyboardButtonColor.SECONDARY
+            )
         if with_his:
             key.add(
                 Text(
@@ -176,6 +215,61 @@ class Keyboards:
         )
         return key.get_json()
 
+    @staticmethod
+    def orders_select(orders: Page[OrderRow], selected: list[int]) -> str:
+        '''Returns orders multi-select keyboard.
+
+        Args:
+            orders (Page[OrderRow]): Page of orders.
+            selected (list[int]): Selected orders UIDs.
+
+        Returns:
+            str: JSON string.
+        '''
+        key = Keyboard(True)
+        flag = False
+        for ord in orders.items:
+            selected_ord = ord.uid in selected
+            key.add(
+                Text(
+                    f'✅ #{ord.uid}' if selected_ord else f'#{ord.uid}',
+                    pack('select_order', uid=ord.uid)
+                ),
+                KeyboardButtonColor.POSITIVE if selected_ord
+                else KeyboardButtonColor.PRIMARY
+            )
+            if flag:
+                flag = False
+                key.row()
+            else:
+                flag = True
+        if flag:
+            key.row()
+        Keyboards._add_pages(key, orders, 'select_orders')
+        if selected:
+            key.add(
+                Text(
+                    'Оплачены',
+                    {'command': 'select_orders_end'}
+                ),
+                KeyboardButtonColor.POSITIVE
+            )
+            key.add(
+                Text(
+                    'Удалить',
+                    {'command': 'select_orders_del'}
+                ),
+                KeyboardButtonColor.NEGATIVE
+            ).row()
+        key.add(
+            Text(
+                'Назад',
+                {'command': 'orders'}
+            ),
+            KeyboardButtonColor.SECONDARY
+        )
+        return key.get_json()
+
     @staticmethod
     def order_ctrl(order: Order) -> str:
         '''Returns order control keyboard.
@@ -190,14 +284,14 @@ class Keyboards:
         key.add(
             Text(
                 'Оплачен',
-                {'command': f'end_order#{order.uid}'}
+                pack('end_order', uid=order.uid)
             ),
             KeyboardButtonColor.POSITIVE
         )
         key.add(
             Text(
                 'Удалить',
-                {'command': f'del_order#{order.uid}'}
+                pack('del_order', uid=order.uid)
             ),
             KeyboardButtonColor.NEGATIVE
         ).row()
@@ -205,7 +299,7 @@ class Keyboards:
             key.add(
                 Text(
                     'Установить цену',
-                    {'command': f'set_price_order#{order.uid}'}
+                    pack('set_price_order', uid=order.uid)
                 ),
                 KeyboardButtonColor.POSITIVE
             ).row()
@@ -219,13 +313,17 @@ class Keyboards:
         return key.get_json()
 
     @staticmethod
-    def orders_history() -> str:
+    def orders_history(orders: Page[OrderRow]) -> str:
         '''Returns orders history keyboard.
 
+        Args:
+            orders (Page[OrderRow]): Page of paid orders.
+
         Returns:
             str: JSON string.
         '''
         key = Keyboard(True)
+        Keyboards._add_pages(key, orders, 'orders_history')
         key.add(Text(
             'Информация о заказе',
             {'command': 'order_info'}
@@ -241,24 +339,47 @@ class Keyboards:
         return key.get_json()
 
     @staticmethod
-    def add_order_agents(agents: list[Agent]) -> str:
+    def export_presets(presets: dict[str, str]) -> str:
+        '''Returns export presets keyboard.
+
+        Args:
+            presets (dict[str, str]): Preset names and btns text.
+
+        Returns:
+            str: JSON string.
+        '''
+        key = Keyboard(True)
+        for name, text in presets.items():
+            key.add(Text(
+                text,
+                pack('export', preset=name)
+            ), KeyboardButtonColor.PRIMARY).row()
+        key.add(Text(
+            'Назад',
+            {'command': 'orders_history'}
+        ), KeyboardButtonColor.SECONDARY)
+        return key.get_json()
+
+    @staticmethod
+    def add_order_agents(agents: Page[Agent]) -> str:
         '''Returns keyboard with agents.
 
         Args:
-            agents (list[Agent]): Array of agents.
+            agents (Page[Agent]): Page of agents.
 
         Returns:
             str: JSON string.
         '''
         key = Keyboard(True)
-        for agent in agents:
+        for agent in agents.items:
             key.add(
                 Text(
                     agent.name,
-                    {'agent_uid': agent.uid}
+                    pack('add_order_agent', agent_uid=agent.uid)
                 ),
                 KeyboardButtonColor.PRIMARY
             ).row()
+        Keyboards._add_pages(key, agents, 'add_order_agents')
         key.add(
             Text(
                 'Назад',
@@ -299,7 +420,7 @@ class Keyboards:
         key.add(
             Text(
                 f'Заказ #{uid}',
-                {'command': f'order#{uid}'}
+                pack('order', uid=uid)
             ),
             KeyboardButtonColor.POSITIVE
         ).row()
@@ -9,23 +9,29 @@ from vkbottle import Bot
 
 from config import cfg
 from cmds import blueprints
+from commands import CommandMiddleware
+from profiles import profiles
 from database.main import db
+from export import shutdown_executor
 
 
 log = logging.getLogger('MoneyTracker')
 bot = Bot(cfg.token)
+profiles.api = bot.api
+bot.labeler.message_view.register_middleware(CommandMiddleware)
 
 
 async def startup_task():
     log.info(f'Loading v{cfg.VERSION}...')
     for bp in blueprints:
         bp.load(bot)
-    db._create_tables()
     await db.connect()
+    await db.migrate()
 
 
 async def shutdown_task():
     log.info('Shutting down...')
+    shutdown_executor()
     await db.disconnect()
 
 
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+#
+#  MoneyTracker: VK users profiles cache.
+#  Created by LulzLoL231 at 18/10/26
+#
+from vkbottle import ABCAPI
+from vkbottle_types.objects import UsersUserFull
+
+from config import cfg
+from database.cache import TTLCache
+from database.loader import BatchLoader
+
+
+class UserProfiles:
+    '''VK users profiles cache, instead of "users.get" for every message.
+
+    Profiles missed in one event loop tick are fetched by one
+    "users.get" call.
+
+    Args:
+        maxsize (int): Max cached profiles count.
+        ttl (float): Profile time to live in seconds.
+    '''
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.api: ABCAPI | None = None
+        self.cache: TTLCache[int, UsersUserFull] = TTLCache(maxsize, ttl)
+        self.loader = BatchLoader(self._load)
+
+    async def get(self, user_id: int) -> UsersUserFull:
+        '''Returns user profile.
+
+        Args:
+            user_id (int): VK user ID, like private message "peer_id".
+
+        Returns:
+            UsersUserFull: User profile.
+        '''
+        user = self.cache.get(user_id)
+        if user is None:
+            user = await self.loader.load(user_id)
+        return user  # type: ignore
+
+    async def _load(self, user_ids: list[int]) -> dict[int, UsersUserFull]:
+        users = {}
+        # "users.get" limit.
+        for i in range(0, len(user_ids), 1000):
+            for user in await self.api.users.get(  # type: ignore
+                user_ids=user_ids[i:i + 1000]
+            ):
+                self.cache.set(user.id, user)
+                users[user.id] = user
+        return users
+
+
+profiles = UserProfiles(cfg.cache_size, cfg.profile_ttl)
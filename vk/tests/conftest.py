@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+#
+#  MoneyTracker: Tests setup.
+#  Created by LulzLoL231 at 18/10/26
+#
+import os
+import sys
+
+
+# Bot modules are imported like in Docker, from bot directory.
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+os.environ.setdefault('BOT_TOKEN', '123456:test')
+# Database tests are skipped without it.
+os.environ.setdefault(
+    'BOT_POSTGRESDSN', 'postgresql://postgres@127.0.0.1/test'
+)
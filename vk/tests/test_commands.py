@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+#
+#  MoneyTracker: Commands tests.
+#  Created by LulzLoL231 at 18/10/26
+#
+import json
+
+import pytest
+
+import cmds  # noqa: F401, registers routes.
+from commands import Command, router
+
+
+def _route_kwargs(payload: dict) -> tuple[str, dict]:
+    command = Command.parse(json.dumps(payload))
+    assert command is not None
+    routes = router.routes[command.action]
+    return command.action, routes[0].parse(command.args)
+
+
+@pytest.mark.parametrize('action', [
+    'order', 'del_order', 'end_order', 'del_agent'
+])
+def test_legacy_uid_payloads(action):
+    assert _route_kwargs({'command': f'{action}#12'}) == (
+        action, {'uid': 12}
+    )
+
+
+def test_legacy_set_price_payload():
+    assert Command.parse('{"command": "set_price_order#12"}') == Command(
+        'set_price_order', {'uid': '12'}
+    )
+
+
+def test_legacy_agent_select_payload():
+    assert _route_kwargs({'agent_uid': 3}) == (
+        'add_order_agent', {'agent_uid': 3}
+    )
+
+
+def test_legacy_del_agents_payload():
+    assert _route_kwargs({'command': 'del_agent'}) == ('del_agents', {})
+
+
+def test_unknown_legacy_payload():
+    assert Command.parse('{"command": "foo#1"}') == Command('foo#1', {})
+
+
+def test_current_payloads():
+    assert _route_kwargs({'command': 'order', 'uid': 5}) == (
+        'order', {'uid': 5}
+    )
+    assert _route_kwargs({'command': 'del_agents', 'after': 4}) == (
+        'del_agents', {'after': 4}
+    )
+
+
+@pytest.mark.parametrize('payload', [None, '', 'x', '[1]'])
+def test_no_command(payload):
+    assert Command.parse(payload) is None